@@ -0,0 +1,6 @@
+#!/usr/bin/python3
+"""benchmarks for the models and the storage engines
+
+    Each module runs with the standard library only:
+        python3 -m benchmarks.<module> [--help]
+    """
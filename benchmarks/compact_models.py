@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+"""measures the memory taken per object by each model class, with and
+    without HBNB_COMPACT_MODELS=1
+
+    Usage: python3 -m benchmarks.compact_models [-n OBJECTS]
+    """
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+_child = """
+import json, sys, tracemalloc, uuid
+from datetime import datetime
+from models.base_model import BaseModel
+from models.user import User
+from models.state import State
+from models.city import City
+from models.amenity import Amenity
+from models.place import Place
+from models.review import Review
+
+samples = {"str": "x" * 12, "int": 3, "float": 1.5, "list": []}
+now = datetime.now().isoformat()
+result = {}
+for cls in (BaseModel, User, State, City, Amenity, Place, Review):
+    fields = {key: samples[type(value).__name__]
+              for klass in cls.__mro__ for key, value in vars(klass).items()
+              if type(value).__name__ in samples and key[0] != "_"}
+    records = [dict(fields, id=str(uuid.uuid4()), created_at=now,
+                    updated_at=now) for _ in range(%d)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objs = [cls(**record) for record in records]
+    result[cls.__name__] = ((tracemalloc.get_traced_memory()[0] - before) /
+                            len(objs))
+    tracemalloc.stop()
+    del objs
+print(json.dumps(result))
+"""
+
+
+def measure(objects, compact):
+    """measure: returns {class name: bytes per object} measured in a
+    child process, compact or not."""
+    env = dict(os.environ, HBNB_COMPACT_MODELS="1" if compact else "0",
+               PYTHONPATH=os.getcwd())
+    env.pop("HBNB_TYPE_STORAGE", None)
+    with tempfile.TemporaryDirectory() as cwd:
+        out = subprocess.run([sys.executable, "-c", _child % objects],
+                             env=env, cwd=cwd, check=True,
+                             capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+def main():
+    """main: prints the bytes per object of each class in both modes."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--objects", type=int, default=20000)
+    args = parser.parse_args()
+    regular = measure(args.objects, False)
+    compact = measure(args.objects, True)
+    print(f"{'class':<10} {'dict B/obj':>10} {'slots B/obj':>11} {'saved':>6}")
+    for name, size in regular.items():
+        saved = 1 - compact[name] / size
+        print(f"{name:<10} {size:>10.0f} {compact[name]:>11.0f}"
+              f" {saved:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
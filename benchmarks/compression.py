@@ -0,0 +1,68 @@
+#!/usr/bin/python3
+"""compares the save time, size on disk and reload time of the JSON
+    snapshot, plain and with each compression, at several store sizes
+
+    Usage: python3 -m benchmarks.compression [-n OBJECTS ...]
+    """
+import argparse
+import glob
+import os
+import tempfile
+import time
+from models.engine.file_storage import FileStorage
+from models.place import Place
+from models.review import Review
+
+
+def measure(objects, compression):
+    """measure: returns the save time, size in bytes and reload time of
+    a store of objects places and reviews."""
+    storage = FileStorage()
+    storage.compression = compression
+    storage.format = "json"
+    storage.shards = None
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            FileStorage._FileStorage__objects = {}
+            for i in range(objects // 2):
+                place = Place(name=f"place {i}", city_id="c" * 36,
+                              user_id="u" * 36, number_rooms=i % 7)
+                storage.new(place)
+                storage.new(Review(place_id=place.id, user_id="u" * 36,
+                                   text="Nice stay " * 5))
+            start = time.perf_counter()
+            storage.compact()
+            saved = time.perf_counter() - start
+            size = sum(os.path.getsize(path) for path in glob.glob("file.*"))
+            FileStorage._FileStorage__objects = {}
+            start = time.perf_counter()
+            storage.reload()
+            loaded = time.perf_counter() - start
+        finally:
+            FileStorage._FileStorage__objects = {}
+            os.chdir(cwd)
+    return saved, size, loaded
+
+
+def main():
+    """main: prints a row per store size and compression."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--objects", type=int, nargs="+",
+                        default=[1000, 10000, 100000])
+    args = parser.parse_args()
+    print(f"{'objects':>8} {'compression':<11} {'save s':>8} {'MiB':>8}"
+          f" {'ratio':>6} {'reload s':>8}")
+    for objects in args.objects:
+        plain = None
+        for compression in (None, "gzip", "bz2", "lzma"):
+            saved, size, loaded = measure(objects, compression)
+            plain = plain or size
+            print(f"{objects:>8} {compression or 'none':<11} {saved:>8.3f}"
+                  f" {size / 2 ** 20:>8.2f} {plain / size:>6.1f}"
+                  f" {loaded:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
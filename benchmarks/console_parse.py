@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+"""measures how many <Class>.<method>(...) commands per second the
+    console parses, with the precompiled dot-call parser and with the
+    regular expressions HBNBCommand.default used before it
+
+    Usage: python3 -m benchmarks.console_parse [-n COMMANDS]
+    """
+import argparse
+import random
+import re
+import time
+import uuid
+from console import HBNBCommand, dot_call
+
+
+def corpus(commands):
+    """corpus: returns a list of commands mixing every method."""
+    rng = random.Random(0)
+    ids = [str(uuid.UUID(int=rng.getrandbits(128))) for _ in range(100)]
+    templates = ['User.show("{id}")', 'Place.destroy("{id}")',
+                 'City.count()', 'Review.all()',
+                 'User.update("{id}", "first_name", "Betty")',
+                 'Place.update("{id}", {{"max_guest": 4, "name": "Home"}})']
+    return [rng.choice(templates).format(id=rng.choice(ids))
+            for _ in range(commands)]
+
+
+def parse_regex(line):
+    """parse_regex: parses line as HBNBCommand.default did: one regular
+    expression compiled on each call, an argument string rebuilt, then
+    split again, and three more for a dictionary update."""
+    if "{" not in line:
+        matching = re.search(
+            r"(\w+)\.(\w+)\(['\"]?(.*?)?['\"]?(?:, (.*?))?(?:, (.*?))?\)",
+            line)
+        args = " ".join(group for group in matching.groups()[:1] +
+                        matching.groups()[2:] if group)
+        return matching.group(2), HBNBCommand.parseLine(args)
+    matching = re.search(r"(\w+)\.(\w+)\((.*?)?(?:, )(.*?)?\)", line)
+    args = matching.group(1) + " " + matching.group(3) + " " + \
+        matching.group(4)
+    return (matching.group(2), [re.findall(r"^(\w+)", args),
+                                re.findall(r"\s+['\"]?((\w+-){4}\w+)['\"]?",
+                                           args),
+                                re.findall(r"({.*})", args)])
+
+
+def parse_compiled(line):
+    """parse_compiled: parses line as HBNBCommand.default does."""
+    cls_name, method, args = dot_call.match(line).groups()
+    return method, [cls_name] + HBNBCommand.parseArguments(args)
+
+
+def measure(parse, lines):
+    """measure: returns the commands parsed per second, best of 3."""
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        for line in lines:
+            parse(line)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(lines) / best
+
+
+def main():
+    """main: prints the throughput of both parsers."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--commands", type=int, default=200000)
+    args = parser.parse_args()
+    lines = corpus(args.commands)
+    regex = measure(parse_regex, lines)
+    compiled = measure(parse_compiled, lines)
+    print(f"{'parser':<10} {'commands/s':>12}")
+    print(f"{'regex':<10} {regex:>12.0f}")
+    print(f"{'compiled':<10} {compiled:>12.0f} ({compiled / regex:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
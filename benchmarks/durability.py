@@ -0,0 +1,55 @@
+#!/usr/bin/python3
+"""measures the saves per second of FileStorage at each durability
+    level, for full snapshots and in journal mode
+
+    Usage: python3 -m benchmarks.durability [-n OBJECTS] [-s SAVES]
+    """
+import argparse
+import os
+import tempfile
+import time
+from models.engine.file_storage import FileStorage
+from models.user import User
+
+
+def measure(objects, saves, durability, journal):
+    """measure: returns the saves per second of a store holding objects
+    users, one of them changed before each save."""
+    storage = FileStorage()
+    storage.durability = durability
+    storage.journal = journal
+    storage.format = "json"
+    storage.write_behind = False
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            FileStorage._FileStorage__objects = {}
+            users = [User() for _ in range(objects)]
+            storage.compact()
+            start = time.perf_counter()
+            for i in range(saves):
+                users[i % objects].first_name = str(i)
+                storage.save()
+            elapsed = time.perf_counter() - start
+        finally:
+            FileStorage._FileStorage__objects = {}
+            os.chdir(cwd)
+    return saves / elapsed
+
+
+def main():
+    """main: prints the saves per second of each durability level."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--objects", type=int, default=1000)
+    parser.add_argument("-s", "--saves", type=int, default=200)
+    args = parser.parse_args()
+    print(f"{'durability':<10} {'snapshot/s':>10} {'journal/s':>10}")
+    for durability in ("none", "flush", "fsync"):
+        snapshot = measure(args.objects, args.saves, durability, False)
+        journal = measure(args.objects, args.saves, durability, True)
+        print(f"{durability:<10} {snapshot:>10.0f} {journal:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
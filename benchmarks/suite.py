@@ -0,0 +1,157 @@
+#!/usr/bin/python3
+"""times the models, the storage and the console at several store sizes
+
+    For each size a child process fills models.storage with that many
+    objects and times BaseModel construction, to_dict(), storage new(),
+    save() and reload(), and the console create, show, all, count and
+    update commands. Each measure reports ops/s and latency percentiles,
+    each size the peak memory of its process, and the whole run is also
+    written as JSON so that runs can be compared. The storage is the one
+    the environment selects: FileStorage, or SQLiteStorage with
+    HBNB_TYPE_STORAGE=sqlite.
+
+    Usage: python3 -m benchmarks.suite [-n SIZE ...] [-o RESULTS.json]
+    """
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+_percentiles = (50, 90, 99)
+
+
+def summarize(latencies):
+    """summarize: returns ops/s and latency percentiles in microseconds
+    of a list of latencies in nanoseconds."""
+    latencies = sorted(latencies)
+    stats = {"ops": len(latencies),
+             "ops_per_sec": len(latencies) * 1e9 / (sum(latencies) or 1)}
+    for p in _percentiles:
+        stats[f"p{p}_us"] = latencies[(len(latencies) - 1) * p // 100] / 1e3
+    stats["max_us"] = latencies[-1] / 1e3
+    return stats
+
+
+def timed(call, args):
+    """timed: calls call once per item of args and returns the list of
+    the latencies in nanoseconds."""
+    clock = time.perf_counter_ns
+    latencies = []
+    for arg in args:
+        start = clock()
+        call(arg)
+        latencies.append(clock() - start)
+    return latencies
+
+
+def child(size):
+    """child: runs every measure on a store of size objects in the
+    current directory and prints the results as JSON."""
+    import resource
+    from contextlib import redirect_stdout
+    from itertools import islice
+    from console import HBNBCommand
+    from models import storage
+    from models.base_model import BaseModel
+    from models.engine.file_storage import FileStorage
+    from models.user import User
+
+    results = {}
+    reps = max(3, min(1000, 100000 // size))
+    objs = []
+    results["BaseModel()"] = summarize(
+        timed(lambda i: objs.append(BaseModel()), range(size)))
+    results["to_dict"] = summarize(timed(BaseModel.to_dict, objs))
+    records = [obj.to_dict() for obj in objs[:min(size, 100000)]]
+    for record in records:
+        del record["__class__"]
+    users = [User(**record) for record in records]
+    results["storage.new"] = summarize(timed(storage.new, users))
+    for user in users:
+        storage.delete(user)
+    del records, users
+    results["storage.save"] = summarize(
+        timed(lambda obj: obj.save(), objs[:reps]))
+
+    def reload(_):
+        if isinstance(storage, FileStorage):
+            FileStorage._FileStorage__objects = {}
+        else:
+            storage.close()
+        storage.reload()
+    results["storage.reload"] = summarize(timed(reload, range(3)))
+    del objs
+
+    console = HBNBCommand()
+    ids = [obj.id for obj in islice(storage.where("BaseModel"), reps)]
+    with open(os.devnull, "w") as null, redirect_stdout(null):
+        results["console create"] = summarize(
+            timed(console.onecmd, ["create User"] * reps))
+        results["console show"] = summarize(
+            timed(console.onecmd, [f"show BaseModel {id}" for id in ids]))
+        results["console all"] = summarize(
+            timed(console.onecmd, ["all User"] * 3))
+        results["console count"] = summarize(
+            timed(console.onecmd, ["BaseModel.count()"] * reps))
+        results["console update"] = summarize(
+            timed(console.onecmd, [f"update BaseModel {id} name x{i}"
+                                   for i, id in enumerate(ids)]))
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak //= 1024
+    print(json.dumps({"size": size, "storage": type(storage).__name__,
+                      "peak_rss_kib": peak,
+                      "results": results}))
+
+
+def run(size):
+    """run: returns the results of child(size) run in a new process in
+    an empty directory, with the storage options of the environment."""
+    env = dict(os.environ, PYTHONPATH=os.getcwd())
+    with tempfile.TemporaryDirectory() as cwd:
+        out = subprocess.run([sys.executable, "-m", "benchmarks.suite",
+                              "--child", str(size)],
+                             env=env, cwd=cwd, check=True,
+                             capture_output=True, text=True).stdout
+    return json.loads(out)
+
+
+def main():
+    """main: runs every size, prints a table and writes the JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--sizes", type=int, nargs="+",
+                        default=[10 ** 3, 10 ** 5, 10 ** 6])
+    parser.add_argument("-o", "--output", default="benchmark-results.json")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child)
+        return
+    run_info = {"time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "env": {key: value for key, value in os.environ.items()
+                        if key.startswith("HBNB_")},
+                "sizes": []}
+    print(f"{'size':>8} {'measure':<16} {'ops/s':>12} {'p50 us':>10}"
+          f" {'p90 us':>10} {'p99 us':>10}")
+    for size in args.sizes:
+        result = run(size)
+        run_info["sizes"].append(result)
+        for name, stats in result["results"].items():
+            print(f"{size:>8} {name:<16} {stats['ops_per_sec']:>12.1f}"
+                  f" {stats['p50_us']:>10.1f} {stats['p90_us']:>10.1f}"
+                  f" {stats['p99_us']:>10.1f}")
+        print(f"{size:>8} {'peak memory':<16}"
+              f" {result['peak_rss_kib'] / 1024:>12.1f} MiB")
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(run_info, f, indent=2)
+    print(f"results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/python3
+"""measures the reads per second of FileStorage in thread-safe mode
+    with several reader threads, alone and next to a writer thread, and
+    without thread safety with a single reader for reference
+
+    A read is a get(), a count() and a find() on an indexed attribute,
+    plus an all() of one class every 100 reads. The writer adds, changes
+    and deletes users and saves every 100 changes.
+
+    Usage: python3 -m benchmarks.threads [-n OBJECTS] [-t THREADS ...]
+    """
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+from models.engine.file_storage import FileStorage
+from models.review import Review
+from models.user import User
+
+
+def fill(storage, objects):
+    """fill: stores objects users and reviews, returning the users."""
+    users = []
+    for i in range(objects // 2):
+        user = User(first_name=f"user {i}")
+        storage.new(user)
+        storage.new(Review(user_id=user.id, place_id="p" * 36, text="ok"))
+        users.append(user)
+    return users
+
+
+def reader(storage, ids, seconds, counts):
+    """reader: reads until seconds elapsed, then appends its count."""
+    rng = random.Random()
+    reads = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        for _ in range(100):
+            id = rng.choice(ids)
+            storage.get(User, id)
+            storage.count(Review)
+            storage.find(Review, user_id=id)
+        storage.all(User)
+        reads += 100
+    counts.append(reads)
+
+
+def writer(storage, stop, counts):
+    """writer: changes users until stop is set, then appends its count.
+    """
+    writes = 0
+    while not stop.is_set():
+        user = User()
+        user.first_name = "writer"
+        storage.delete(user)
+        writes += 1
+        if writes % 100 == 0:
+            storage.save()
+    counts.append(writes)
+
+
+def measure(objects, threads, seconds, thread_safe, writing):
+    """measure: returns the reads and writes per second of threads
+    readers, with a writer if writing."""
+    storage = FileStorage()
+    storage.thread_safe = thread_safe
+    storage.format = "json"
+    storage.journal = False
+    storage.shards = None
+    storage.locking = False
+    storage.compression = None
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            FileStorage._FileStorage__objects = {}
+            ids = [user.id for user in fill(storage, objects)]
+            reads, writes = [], []
+            stop = threading.Event()
+            workers = [threading.Thread(target=reader,
+                                        args=(storage, ids, seconds, reads))
+                       for _ in range(threads)]
+            if writing:
+                workers.append(threading.Thread(
+                    target=writer, args=(storage, stop, writes)))
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers[:threads]:
+                worker.join()
+            stop.set()
+            for worker in workers[threads:]:
+                worker.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            FileStorage._FileStorage__objects = {}
+            os.chdir(cwd)
+    return sum(reads) / elapsed, sum(writes) / elapsed
+
+
+def main():
+    """main: prints a row per mode and number of reader threads."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--objects", type=int, default=10000)
+    parser.add_argument("-t", "--threads", type=int, nargs="+",
+                        default=[1, 2, 4, 8])
+    parser.add_argument("-s", "--seconds", type=float, default=2)
+    args = parser.parse_args()
+    print(f"{'mode':<18} {'readers':>7} {'reads/s':>12} {'writes/s':>10}")
+    reads, _ = measure(args.objects, 1, args.seconds, False, False)
+    print(f"{'unsafe':<18} {1:>7} {reads:>12.0f} {'-':>10}")
+    for writing in (False, True):
+        mode = "safe + writer" if writing else "safe"
+        for threads in args.threads:
+            reads, writes = measure(args.objects, threads, args.seconds,
+                                    True, writing)
+            writes = f"{writes:.0f}" if writing else "-"
+            print(f"{mode:<18} {threads:>7} {reads:>12.0f} {writes:>10}")
+
+
+if __name__ == "__main__":
+    main()
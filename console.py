@@ -1,27 +1,240 @@
 #!/usr/bin/python3
-"""the console program for AirBnB."""
+"""the console program for AirBnB.
 
+    Usage: console.py [--batch [SCRIPT]]
+
+    With --batch the commands are read from SCRIPT, or from the standard
+    input if it is omitted or "-", and run without prompts in a single
+    storage batch.
+    """
+
+import argparse
+import builtins
 import cmd
-from models.base_model import BaseModel
-from models.user import User
-from models.state import State
-from models.city import City
-from models.amenity import Amenity
-from models.place import Place
-from models.review import Review
-from models import storage
+import cProfile
+from collections import deque
+from collections.abc import Iterator
+from contextlib import redirect_stdout
+import functools
+import heapq
+from itertools import chain, islice
+from models import classes, storage
 import json
+import pstats
 import re
+import sys
+import time
+
+condition = re.compile(r"""\s*(\w+)\s*(==|!=|<=|>=|=|<|>)\s*
+                       ("(?:[^"\\]|\\.)*"|'[^']*'|[^,\s]+)\s*(?:,|(?=\w)|$)""",
+                       re.VERBOSE)
+dot_call = re.compile(r"(\w+)\.(\w+)\((.*)\)\s*$")
+argument = re.compile(r""""([^"]*)"|'([^']*)'|(\{.*\})
+                      |([^,\s]+(?:\s+[^,\s]+)*)""", re.VERBOSE)
+dict_update = re.compile(r"""(\w*)[\s,]*['"]?([\w-]*)['"]?[\s,]*
+                         (\{.*\})\s*$""", re.VERBOSE)
+
+
+class CommandProfile:
+    """CommandProfile: the latencies of the last window commands of each
+    kind, split into phases: parsing the arguments, looking objects up in
+    storage (including iterating what where() yields), changing them
+    (storage new(), delete() and touch(), called on every attribute
+    assignment), storage.save(), printing, and the rest.
+
+    install() wraps the parsers, the storage methods, printObjects() and
+    the print() of this module, and uninstall() restores them. The
+    phases are exclusive: a lookup made while printing counts as lookup,
+    not print. With cprofile, each command also runs under cProfile and
+    the profiles of the slowest ones are kept.
+    """
+
+    window = 10000
+    slowest = 5
+    names = ("parse", "lookup", "mutation", "save", "print", "other")
+    phases = {"get": "lookup", "all": "lookup", "count": "lookup",
+              "find": "lookup", "where": "lookup", "new": "mutation",
+              "delete": "mutation", "touch": "mutation", "save": "save"}
+    helpers = {"parseLine": "parse", "parseArguments": "parse",
+               "parseConditions": "parse", "parsePaging": "parse",
+               "printObjects": "print"}
+
+    def __init__(self, cprofile=False):
+        """__init__.
+
+        :param cprofile: True to keep cProfile data of the slowest calls
+        """
+        self.cprofile = cprofile
+        self.samples = {}
+        self.slow = []
+        self.current = None
+        self.phase = None
+        self.since = None
+        self.calls = 0
+
+    def install(self):
+        """install: wraps the functions timed as phases."""
+        for name, phase in CommandProfile.phases.items():
+            setattr(storage, name, self.wrap(getattr(storage, name), phase))
+        for name, phase in CommandProfile.helpers.items():
+            setattr(HBNBCommand, name,
+                    staticmethod(self.wrap(getattr(HBNBCommand, name),
+                                           phase)))
+        globals()["print"] = self.wrap(builtins.print, "print")
+
+    def uninstall(self):
+        """uninstall: restores the wrapped functions."""
+        for name in CommandProfile.phases:
+            storage.__dict__.pop(name, None)
+        for name in CommandProfile.helpers:
+            setattr(HBNBCommand, name, staticmethod(
+                getattr(HBNBCommand, name).__wrapped__))
+        globals().pop("print", None)
+
+    def switch(self, phase):
+        """switch: adds the time since the last switch to the phase that
+        was running, then runs phase, and returns the phase it was."""
+        now = time.perf_counter()
+        self.current[self.phase] += now - self.since
+        self.since = now
+        outer, self.phase = self.phase, phase
+        return outer
+
+    def wrap(self, method, phase):
+        """wrap: returns method counting its time, and the time spent
+        iterating what it returns if that is an iterator, as phase while
+        a command runs."""
+        @functools.wraps(method)
+        def timed(*args, **kwargs):
+            if self.current is None:
+                return method(*args, **kwargs)
+            outer = self.switch(phase)
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                self.switch(outer)
+            if isinstance(result, Iterator):
+                return self.iterate(result, phase)
+            return result
+        return timed
+
+    def iterate(self, iterator, phase):
+        """iterate: yields what iterator yields, counting the time taken
+        by each next() as phase while a command runs."""
+        while True:
+            outer = None
+            if self.current is not None:
+                outer = self.switch(phase)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                if outer is not None:
+                    self.switch(outer)
+            yield item
+
+    def run(self, kind, line, call):
+        """run: calls call, recording its latency under kind.
+
+        :param kind: the command name
+        :param line: the command line
+        :param call: the function running the command
+        :return: what call returns
+        """
+        outer = (self.current, self.phase, self.since)
+        self.current = dict.fromkeys(CommandProfile.names, 0.0)
+        self.phase = "other"
+        profile = cProfile.Profile() if self.cprofile else None
+        self.since = time.perf_counter()
+        try:
+            if profile is None:
+                return call()
+            return profile.runcall(call)
+        finally:
+            self.switch("other")
+            phases = self.current
+            self.current, self.phase, self.since = outer
+            total = sum(phases.values())
+            phases["total"] = total
+            samples = self.samples.setdefault(kind, {})
+            for phase, seconds in phases.items():
+                samples.setdefault(phase, deque(maxlen=self.window)).append(
+                    seconds)
+            self.calls += 1
+            if profile is not None:
+                slow = (total, self.calls, line, profile)
+                if len(self.slow) < self.slowest:
+                    heapq.heappush(self.slow, slow)
+                else:
+                    heapq.heappushpop(self.slow, slow)
+
+    @staticmethod
+    def percentile(samples, p):
+        """percentile: returns the p-th percentile of samples."""
+        samples = sorted(samples)
+        return samples[(len(samples) - 1) * p // 100]
+
+    def dump(self, path=None):
+        """dump: prints p50 and p99 of each kind of command, in ms, then
+        the slowest commands profiled, and writes their merged cProfile
+        data to path if given."""
+        print(f"{'command':<10} {'calls':>6} {'p50':>8} {'p99':>8}" +
+              "".join(f" {phase:>8}" for phase in CommandProfile.names) +
+              "  (ms, phases at p50)")
+        for kind, samples in sorted(self.samples.items()):
+            p50 = {phase: self.percentile(values, 50) * 1e3
+                   for phase, values in samples.items()}
+            p99 = self.percentile(samples["total"], 99) * 1e3
+            print(f"{kind:<10} {len(samples['total']):>6}"
+                  f" {p50['total']:>8.3f} {p99:>8.3f}" +
+                  "".join(f" {p50[phase]:>8.3f}"
+                          for phase in CommandProfile.names))
+        slow = sorted(self.slow, reverse=True)
+        for total, _, line, _ in slow:
+            print(f"slow: {total * 1e3:.3f} ms: {line}")
+        if path is not None and slow:
+            stats = pstats.Stats(slow[0][3])
+            for _, _, _, profile in slow[1:]:
+                stats.add(profile)
+            stats.dump_stats(path)
+            print(f"cProfile data of {len(slow)} commands written to {path}")
+
+
+class ErrorFilter:
+    """ErrorFilter: a stream passing each line written to it on to out
+    as soon as it ends, except the error lines ("** ..." or "*** ..."),
+    which it keeps in errors instead.
+    """
+
+    def __init__(self, out):
+        """__init__.
+
+        :param out: the stream the other lines go to
+        """
+        self.out = out
+        self.errors = []
+        self.__line = ""
+
+    def write(self, text):
+        """write: passes on or keeps the lines text ends."""
+        lines = (self.__line + text).split("\n")
+        self.__line = lines.pop()
+        for line in lines:
+            if line.startswith("**"):
+                self.errors.append(line)
+            else:
+                self.out.write(line + "\n")
+        return len(text)
 
-classes = {
-    "BaseModel": BaseModel,
-    "User": User,
-    "State": State,
-    "City": City,
-    "Amenity": Amenity,
-    "Place": Place,
-    "Review": Review
-}
+    def flush(self):
+        """flush: flushes out."""
+        self.out.flush()
+
+    def end(self):
+        """end: handles the unfinished last line as a whole one."""
+        if self.__line:
+            self.write("\n")
 
 
 class HBNBCommand(cmd.Cmd):
@@ -32,6 +245,7 @@ class HBNBCommand(cmd.Cmd):
     """
 
     prompt = "(hbnb) "
+    profile = None
 
     @staticmethod
     def parseLine(line):
@@ -41,21 +255,193 @@ class HBNBCommand(cmd.Cmd):
         """
         return list(line.split())
 
+    @staticmethod
+    def parseArguments(line):
+        """parses the arguments of a <Class_name>.<method>(...) call:
+        quotes are removed and a dictionary is kept as its source text
+
+        :param line: the text between the parentheses
+        :return: the list of arguments
+        """
+        return [double or single or dictionary or bare
+                for double, single, dictionary, bare
+                in argument.findall(line)]
+
+    @staticmethod
+    def parseValue(text):
+        """parses a value of a where condition: a quoted string, a
+        number, or else the text itself
+
+        :param text: the value as typed
+        """
+        if text.startswith('"'):
+            return json.loads(text)
+        if text.startswith("'"):
+            return text[1:-1]
+        for cast in (int, float):
+            try:
+                return cast(text)
+            except ValueError:
+                pass
+        return text
+
+    @staticmethod
+    def castValue(obj, attr, value):
+        """casts a string to a number, or a number to a string, when the
+        attribute attr of obj (an instance or a class) holds the other:
+        "50" for price_by_night becomes 50. An id is always a string.
+
+        :param obj: the instance or class
+        :param attr: the attribute name
+        :param value: the value as parsed
+        :return: the value, cast if needed and possible
+        """
+        current = getattr(obj, attr, "" if attr == "id" else None)
+        if (type(current) in (str, int, float) and
+                isinstance(value, str) != isinstance(current, str)):
+            try:
+                return type(current)(value)
+            except ValueError:
+                pass
+        return value
+
+    @staticmethod
+    def parseConditions(line):
+        """parses comma separated conditions like city_id="..." or
+        price_by_night<100 into (attribute, operator, value) tuples
+
+        :param line: the conditions
+        :return: the list of conditions, None if line is not valid
+        """
+        conditions = []
+        pos = 0
+        line = line.strip()
+        while pos < len(line):
+            matching = condition.match(line, pos)
+            if not matching:
+                return None
+            try:
+                value = HBNBCommand.parseValue(matching.group(3))
+            except json.JSONDecodeError:
+                return None
+            conditions.append((matching.group(1), matching.group(2), value))
+            pos = matching.end()
+        return conditions
+
+    @staticmethod
+    def printObjects(objs):
+        """prints the string representation of each object of objs the
+        way print() shows a list of them, writing one object at a time
+
+        :param objs: an iterable of objects
+        """
+        print("[", end="")
+        separator = ""
+        for obj in objs:
+            print(separator + repr(str(obj)), end="")
+            separator = ", "
+        print("]")
+
+    @staticmethod
+    def page(objs, limit=None, offset=0, after=None):
+        """returns an iterator over a page of objs, read lazily
+
+        :param objs: an iterable of objects
+        :param limit: the size of the page, None for no limit
+        :param offset: the number of objects skipped before the page
+        :param after: the id of the object the page starts after
+        """
+        objs = iter(objs)
+        if after is not None:
+            for obj in objs:
+                if obj.id == after:
+                    break
+        return islice(objs, offset, None if limit is None else offset + limit)
+
+    @staticmethod
+    def parsePaging(line):
+        """parses the limit=, offset= and after= options of all
+
+        :param line: the options
+        :return: the keyword arguments of page(), None if not valid
+        """
+        options = HBNBCommand.parseConditions(line)
+        if options is None:
+            return None
+        paging = {}
+        for name, op, value in options:
+            if op != "=" or name not in ("limit", "offset", "after"):
+                return None
+            if name == "after":
+                value = str(value)
+            elif type(value) is not int or value < 0:
+                return None
+            paging[name] = value
+        return paging
+
     def countInstance(self, cls_name):
         """countInstance: counts the number of instances for a specific obj.
 
         Usage: <Class name>.count()
         """
-        storage_dic = storage.all()
-        counter = 0
         if cls_name not in classes.keys():
             print("** class doesn't exist **")
             return
-        for key in storage_dic.keys():
-            matching = re.search(r"^({})\..+".format(cls_name), key)
-            if matching:
-                counter += 1
-        print(counter)
+        print(storage.count(cls_name))
+
+    def run_batch(self, lines):
+        """run_batch: runs one command per line inside storage.batch(), so
+        the store is saved once at the end, then reports the throughput
+        and the commands that failed on stderr.
+
+        Blank lines and lines starting with # are skipped. A command
+        fails if it prints an error ("** ..." or "*** ...") or raises;
+        the rest of its output is printed line by line as it comes.
+
+        :param lines: an iterable of command lines
+        :return: the list of (line number, command, error message)
+        """
+        errors = []
+        count = 0
+        start = time.perf_counter()
+        with storage.batch():
+            for number, line in enumerate(lines, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                count += 1
+                output = ErrorFilter(sys.stdout)
+                with redirect_stdout(output):
+                    try:
+                        stop = self.onecmd(line)
+                    except Exception as e:
+                        stop = False
+                        print(f"** {type(e).__name__}: {e} **")
+                    output.end()
+                errors.extend((number, line, out) for out in output.errors)
+                if stop:
+                    break
+        elapsed = time.perf_counter() - start
+        print(f"{count} commands in {elapsed:.3f}s"
+              f" ({count / (elapsed or 1e-9):.0f} commands/s),"
+              f" {len(errors)} error{'' if len(errors) == 1 else 's'}",
+              file=sys.stderr)
+        for number, line, message in errors:
+            print(f"line {number}: {line}: {message}", file=sys.stderr)
+        return errors
+
+    def onecmd(self, line):
+        """onecmd: runs a command, timing it when profiling is on.
+        """
+        profile = HBNBCommand.profile
+        if profile is None:
+            return super().onecmd(line)
+        matching = dot_call.match(line)
+        kind = matching.group(2) if matching else self.parseline(line)[0]
+        if kind == "profile":
+            return super().onecmd(line)
+        return profile.run(kind or "empty", line,
+                           lambda: super(HBNBCommand, self).onecmd(line))
 
     def emptyline(self):
         """emptyline and enter does nothing anymore.
@@ -65,65 +451,34 @@ class HBNBCommand(cmd.Cmd):
     def default(self, line):
         """default.
 
-        overrides the default behavior of cmd
+        overrides the default behavior of cmd: runs the
+        <Class_name>.<method>(<arguments>) calls
         """
-        cmd_methods = {
-            "all": self.do_all,
-            "create": self.do_create,
-            "show": self.do_show,
-            "destroy": self.do_destroy,
-            "update": self.do_update,
-            "count": self.countInstance
-        }
-        if "{" not in line:
-            matching = re.search(
-                r"(\w+)\.(\w+)\(['\"]?(.*?)?['\"]?(?:, (.*?))?(?:, (.*?))?\)",
-                line)
-            if matching:
-                if matching.group(2) in cmd_methods:
-                    call = cmd_methods[matching.group(2)]
-                    if not matching.group(3):
-                        call(matching.group(1))
-                    elif not matching.group(4):
-                        args = matching.group(1) + " " + matching.group(3)
-                        call(args)
-                    elif not matching.group(5):
-                        args = matching.group(
-                            1) + " " + matching.group(3) +\
-                            " " + matching.group(4)
-                        call(args)
-                    else:
-                        args = matching.group(
-                            1) + " " + matching.group(3) + " " +\
-                            matching.group(4) + " " + matching.group(5)
-                        call(args)
-                else:
-                    print(f"*** Unknown syntax: {line}")
-            else:
-                print(f"*** Unknown syntax: {line}")
+        matching = dot_call.match(line)
+        if not matching or matching.group(2) not in HBNBCommand.calls:
+            print(f"*** Unknown syntax: {line}")
+            return
+        cls_name, method, args = matching.groups()
+        if method in ("all", "where"):
+            HBNBCommand.calls[method](self, cls_name + " " + args)
+            return
+        args = HBNBCommand.parseArguments(args)
+        if method == "update" and len(args) == 2 and args[1][:1] == "{":
+            self.updateDict(cls_name, args[0], args[1])
         else:
-            matching = re.search(r"(\w+)\.(\w+)\((.*?)?(?:, )(.*?)?\)", line)
-            if matching:
-                if matching.group(2) in cmd_methods:
-                    call = cmd_methods[matching.group(2)]
-                    args = matching.group(
-                        1) + " " + matching.group(3) + " " +\
-                        matching.group(4)
-                    call(args)
-                else:
-                    print(f"*** Unknown syntax: {line}")
-            else:
-                print(f"*** Unknown syntax: {line}")
+            HBNBCommand.calls[method](self, [cls_name] + args)
 
     def do_quit(self, line):
         """Quit command to exit the program.
         """
+        storage.flush()
         return True
 
     def do_EOF(self, line):
         """(Ctrl+D): Exit the program.
         """
         print("")
+        storage.flush()
         return True
 
     def do_create(self, line):
@@ -131,8 +486,10 @@ class HBNBCommand(cmd.Cmd):
 
         Usage: create <Class_name> <Class_id>
         """
+        self.create(HBNBCommand.parseLine(line))
 
-        token = HBNBCommand.parseLine(line)
+    def create(self, token):
+        """create: the create command on its tokens."""
         if token == []:
             print("** class name missing **")
         elif token[0] in classes.keys():
@@ -147,121 +504,223 @@ class HBNBCommand(cmd.Cmd):
 
         Usage: show <Class_name> <Class_id>
         """
-        token = HBNBCommand.parseLine(line)
-        obj_dic = storage.all()
+        self.show(HBNBCommand.parseLine(line))
+
+    def show(self, token):
+        """show: the show command on its tokens."""
         if token == []:
             print("** class name missing **")
         elif token[0] not in classes.keys():
             print("** class doesn't exist **")
         elif len(token) == 1:
             print("** instance id missing **")
-        elif f"{token[0]}.{token[1]}" not in obj_dic:
+        elif storage.get(token[0], token[1]) is None:
             print("** no instance found **")
         else:
-            print(obj_dic["{}.{}".format(token[0], token[1])])
+            print(storage.get(token[0], token[1]))
 
     def do_destroy(self, line):
         """Deletes an instance based on the class name and id
 
         Usage: destroy <Class_name> <Class_id>
         """
-        token = HBNBCommand.parseLine(line)
-        obj_dic = storage.all()
+        self.destroy(HBNBCommand.parseLine(line))
+
+    def destroy(self, token):
+        """destroy: the destroy command on its tokens."""
         if token == []:
             print("** class name missing **")
         elif token[0] not in classes.keys():
             print("** class doesn't exist **")
         elif len(token) == 1:
             print("** instance id missing **")
-        elif f"{token[0]}.{token[1]}" not in obj_dic:
+        elif storage.get(token[0], token[1]) is None:
             print("** no instance found **")
         else:
-            dest_cls = f"{token[0]}.{token[1]}"
-            for key in obj_dic.keys():
-                if dest_cls == key:
-                    break
-            del obj_dic[dest_cls]
+            storage.delete(storage.get(token[0], token[1]))
             storage.save()
 
     def do_all(self, line):
         """do_all.
             Prints all string representation of all\
-instances based or not on the class name
+instances based or not on the class name, one at a time
+
+        Usage: all <Class_name(optional)> <limit=N offset=N after=id>
+        Usage: <Class_name>.all(<limit=N, offset=N, after="id">)
+        """
+        token = line.split(None, 1)
+        if len(token) > 0 and re.match(r"\w+\s*=", token[0]):
+            token = ["", line]
+        paging = HBNBCommand.parsePaging(token[1] if len(token) > 1 else "")
+        if len(token) > 0 and token[0] and token[0] not in classes.keys():
+            print("** class doesn't exist **")
+        elif paging is None:
+            print("** invalid paging option **")
+        elif len(token) > 0 and token[0]:
+            HBNBCommand.printObjects(HBNBCommand.page(
+                storage.where(token[0]), **paging))
+        else:
+            HBNBCommand.printObjects(HBNBCommand.page(chain.from_iterable(
+                storage.where(name) for name in classes), **paging))
+
+    def do_profile(self, line):
+        """Times every command: on starts from zero (with cprofile, also
+        profiling them), off stops, dump prints p50/p99 per command and
+        writes the cProfile data of the slowest ones to <file>
 
-        Usage: all <Class_name(optional)>
+        Each command is split into parse, lookup, mutation, save, print
+        and other phases; other is the time spent in the command itself
+        (checking arguments, setting attributes) outside the others.
+
+        Usage: profile on <cprofile(optional)>
+        Usage: profile off
+        Usage: profile dump <file(optional)>
+        """
+        token = HBNBCommand.parseLine(line)
+        if token in (["on"], ["on", "cprofile"]):
+            if HBNBCommand.profile is not None:
+                HBNBCommand.profile.uninstall()
+            HBNBCommand.profile = CommandProfile(len(token) == 2)
+            HBNBCommand.profile.install()
+        elif token == ["off"]:
+            if HBNBCommand.profile is not None:
+                HBNBCommand.profile.uninstall()
+            HBNBCommand.profile = None
+        elif token[:1] == ["dump"] and len(token) <= 2:
+            if HBNBCommand.profile is None:
+                print("** profile is off **")
+            else:
+                HBNBCommand.profile.dump(*token[1:])
+        else:
+            print("** invalid option **")
+
+    def do_stats(self, line):
+        """Prints the counters and timers of the storage, or turns them
+        on (from zero) or off
+
+        Usage: stats <on|off(optional)>
         """
-        all_dic = []
-        obj_dic = storage.all()
         token = HBNBCommand.parseLine(line)
-        if len(token) > 0 and token[0] not in classes.keys():
+        if token in (["on"], ["off"]):
+            storage.enable_stats(token[0] == "on")
+        elif token != []:
+            print("** invalid option **")
+        elif storage.stats() is None:
+            print("** stats are off **")
+        else:
+            stats = storage.stats()
+            for name, value in stats["counters"].items():
+                print(f"{name}: {value}")
+            for name, timer in stats["timers"].items():
+                print(f"{name}: {timer['calls']} calls,"
+                      f" {timer['seconds']:.6f}s")
+
+    def do_where(self, line):
+        """Prints the string representation of the instances of a class
+        that meet every condition, using the storage indexes if it can
+
+        Usage: where <Class_name> <attribute><operator><value>, ...
+        Usage: <Class_name>.where(<attribute><operator><value>, ...)
+        The operators are =, ==, !=, <, <=, > and >=.
+        """
+        token = line.split(None, 1)
+        if token == []:
+            print("** class name missing **")
+        elif token[0] not in classes.keys():
             print("** class doesn't exist **")
-        elif len(token) > 0 and token[0] in classes.keys():
-            for obj in obj_dic.values():
-                if token[0] == obj.__class__.__name__:
-                    all_dic.append(obj.__str__())
-            print(all_dic)
         else:
-            for obj in obj_dic.values():
-                all_dic.append(obj.__str__())
-            print(all_dic)
+            conditions = HBNBCommand.parseConditions(
+                token[1] if len(token) > 1 else "")
+            if conditions is None:
+                print("** invalid condition **")
+            else:
+                cls = classes[token[0]]
+                HBNBCommand.printObjects(storage.where(token[0], *[
+                    (attr, op, HBNBCommand.castValue(cls, attr, value))
+                    for attr, op, value in conditions]))
 
     def do_update(self, line):
         """Updates an instance based on the class name and id
 
         Usage: Update <Class_name> <Class_id> <attribute> <value>
+        Usage: Update <Class_name> <Class_id> <dictionary>
         """
-        obj_dic = storage.all()
         if "{" not in line:
-            token = HBNBCommand.parseLine(line)
-            if token == []:
-                print("** class name missing **")
-            elif token[0] not in classes.keys():
-                print("** class doesn't exist **")
-            elif len(token) == 1:
-                print("** instance id missing **")
-            elif f"{token[0]}.{token[1]}" not in obj_dic:
-                print("** no instance found **")
-            elif len(token) == 2:
-                print("** attribute name missing **")
-            elif len(token) == 3:
-                print("** value missing **")
-            else:
-                update_dic = obj_dic["{}.{}".format(token[0], token[1])]
-                if token[2] in update_dic.__dict__:
-                    attrtype = type(update_dic.__dict__[token[2]])
-                    setattr(update_dic, token[2], attrtype(token[3]))
-                else:
-                    setattr(update_dic, token[2], token[3])
-                storage.save()
+            self.update(HBNBCommand.parseLine(line))
+            return
+        matching = dict_update.match(line)
+        if not matching:
+            print("** invalid syntax")
         else:
-            cls_name = re.findall(r"^(\w+)", line)
-            cls_id = re.findall(r"\s+['\"]?((\w+-){4}\w+)['\"]?", line)
-            cls_dic_raw = re.findall(r"({.*})", line)
-            cls_dic = cls_dic_raw[0].replace("'", "\"")
-            if not cls_name:
-                print("** class name missing **")
-            elif cls_name[0] not in classes.keys():
-                print("** class doesn't exist **")
-            elif cls_id == []:
-                print("** instance id missing **")
-            elif f"{cls_name[0]}.{cls_id[0][0]}" not in obj_dic:
-                print("** no instance found **")
-            else:
-                update_dic = obj_dic["{}.{}".format(
-                    cls_name[0], cls_id[0][0])]
-                try:
-                    add_dic = json.loads(cls_dic)
-                except json.JSONDecodeError:
-                    print("** invalid syntax")
-                    return
-                for add_key, add_value in add_dic.items():
-                    if add_key in update_dic.__dict__:
-                        attrtype = type(update_dic.__dict__[add_key])
-                        setattr(update_dic, add_key, attrtype(add_value))
-                    else:
-                        setattr(update_dic, add_key, add_value)
-                storage.save()
+            self.updateDict(*matching.groups())
+
+    def update(self, token):
+        """update: the update command on its tokens."""
+        if token == []:
+            print("** class name missing **")
+        elif token[0] not in classes.keys():
+            print("** class doesn't exist **")
+        elif len(token) == 1:
+            print("** instance id missing **")
+        elif storage.get(token[0], token[1]) is None:
+            print("** no instance found **")
+        elif len(token) == 2:
+            print("** attribute name missing **")
+        elif len(token) == 3:
+            print("** value missing **")
+        else:
+            update_dic = storage.get(token[0], token[1])
+            setattr(update_dic, token[2],
+                    HBNBCommand.castValue(update_dic, token[2], token[3]))
+            storage.save()
+
+    def updateDict(self, cls_name, cls_id, cls_dic):
+        """updateDict: the update command with a dictionary.
+
+        :param cls_name: the class name
+        :param cls_id: the instance id
+        :param cls_dic: the source text of the dictionary
+        """
+        if not cls_name:
+            print("** class name missing **")
+        elif cls_name not in classes.keys():
+            print("** class doesn't exist **")
+        elif not cls_id:
+            print("** instance id missing **")
+        elif storage.get(cls_name, cls_id) is None:
+            print("** no instance found **")
+        else:
+            update_dic = storage.get(cls_name, cls_id)
+            try:
+                add_dic = json.loads(cls_dic.replace("'", "\""))
+            except json.JSONDecodeError:
+                print("** invalid syntax")
+                return
+            for add_key, add_value in add_dic.items():
+                setattr(update_dic, add_key,
+                        HBNBCommand.castValue(update_dic, add_key, add_value))
+            storage.save()
+
+    calls = {
+        "all": do_all,
+        "count": lambda self, token: self.countInstance(token[0]),
+        "create": create,
+        "destroy": destroy,
+        "show": show,
+        "update": update,
+        "where": do_where
+    }
 
 
 if __name__ == '__main__':
-    HBNBCommand().cmdloop()
+    parser = argparse.ArgumentParser(description="the AirBnB console")
+    parser.add_argument("--batch", nargs="?", const="-", metavar="SCRIPT",
+                        help="run the commands of SCRIPT (default: stdin)")
+    args = parser.parse_args()
+    if args.batch is None:
+        HBNBCommand().cmdloop()
+    elif args.batch == "-":
+        sys.exit(1 if HBNBCommand().run_batch(sys.stdin) else 0)
+    else:
+        with open(args.batch, encoding="utf-8") as script:
+            sys.exit(1 if HBNBCommand().run_batch(script) else 0)
@@ -1,7 +1,18 @@
 #!/usr/bin/python3
-"""__init__ magic method for models directory"""
-from models.engine.file_storage import FileStorage as FS
+"""__init__ magic method for models directory
 
+    Importing the package imports every model, which registers it in
+    classes (see base_model). HBNB_TYPE_STORAGE=sqlite selects the SQLite
+    engine instead of the JSON file one.
+    """
+from os import getenv
+from models.base_model import classes
+from models import user, state, city, amenity, place, review
 
-storage = FS()
+if getenv("HBNB_TYPE_STORAGE") == "sqlite":
+    from models.engine.sqlite_storage import SQLiteStorage
+    storage = SQLiteStorage()
+else:
+    from models.engine.file_storage import FileStorage as FS
+    storage = FS()
 storage.reload()
@@ -1,16 +1,111 @@
 #!/usr/env/python3
-"""clase BaseModel"""
+"""clase BaseModel
+
+    With HBNB_COMPACT_MODELS=1 in the environment the models are compact:
+    id, created_at, updated_at and the attributes a class declares are
+    stored in __slots__, and any other attribute in an overflow dict.
+    """
 
 from datetime import datetime
 import models
+import os
 import uuid
 
+COMPACT = os.getenv("HBNB_COMPACT_MODELS", "0") == "1"
+classes = {}
+
+
+def parse_datetime(value):
+    """parse_datetime: returns the datetime of an isoformat() string.
+
+    datetime.fromisoformat() is implemented in C and parses the format
+    to_dict() writes many times faster than strptime(), which is only
+    kept as a fallback for the strings fromisoformat() rejects.
+    """
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, '%Y-%m-%dT%H:%M:%S.%f')
+
+
+class _Field:
+    """_Field: a declared attribute of a compact model, read from its slot
+    or, while the slot is empty or when read on the class, its default."""
+
+    __slots__ = ("member", "default")
+
+    def __init__(self, member, default):
+        """__init__.
+
+        :param member: the slot descriptor created for the attribute
+        :param default: the value declared in the class body
+        """
+        self.member = member
+        self.default = default
+
+    def __get__(self, obj, cls=None):
+        """__get__."""
+        if obj is not None:
+            try:
+                return self.member.__get__(obj, cls)
+            except AttributeError:
+                pass
+        return self.default
+
+    def __set__(self, obj, value):
+        """__set__."""
+        self.member.__set__(obj, value)
+
+    def __delete__(self, obj):
+        """__delete__."""
+        self.member.__delete__(obj)
+
+
+class _ModelType(type):
+    """metaclass of the models: it registers every model in classes under
+    its name. In compact mode it also stores the public data attributes
+    declared by a class in __slots__, behind a _Field holding the
+    declared value, and records every slot in _members."""
 
-class BaseModel:
+    def __new__(mcs, name, bases, namespace):
+        """__new__."""
+        if not COMPACT:
+            cls = super().__new__(mcs, name, bases, namespace)
+            classes[name] = cls
+            return cls
+        fields = tuple(
+            key for key, value in namespace.items()
+            if not key.startswith("_") and not callable(value) and
+            not isinstance(value, (property, classmethod, staticmethod)))
+        defaults = {key: namespace.pop(key) for key in fields}
+        slots = fields
+        if not any(isinstance(base, _ModelType) for base in bases):
+            fields = ("id", "created_at", "updated_at") + fields
+            slots = fields + ("_extra", "__weakref__")
+        namespace["__slots__"] = slots
+        cls = super().__new__(mcs, name, bases, namespace)
+        members = {}
+        for base in reversed(bases):
+            members.update(getattr(base, "_members", {}))
+        for key in fields:
+            members[key] = cls.__dict__[key]
+            if key in defaults:
+                setattr(cls, key, _Field(members[key], defaults[key]))
+        cls._members = members
+        classes[name] = cls
+        return cls
+
+
+class BaseModel(metaclass=_ModelType):
     """class BaseModel
         Represent all the common functionalities of the classes in the project.
+
+        Attributes:
+            _indexed (tuple): attributes the storage keeps a hash index on.
         """
 
+    _indexed = ()
+
     def __init__(self, *args, **kwargs):
         """Initialize a new BaseModel.
 
@@ -18,19 +113,87 @@ class BaseModel:
                 *args (any): Unused.
                 **kwargs (dict): Key/value pairs of attributes.
         """
-        self.id = str(uuid.uuid4())
-        self.created_at = datetime.now()
-        self.updated_at = datetime.now()
+        if COMPACT:
+            object.__setattr__(self, "_extra", None)
+            store = self.__store
+        else:
+            store = self.__dict__.__setitem__
         if len(kwargs) > 0:
-            for key, value in kwargs.items():
-                if key in ["created_at", "updated_at"]:
-                    self.__dict__[key] = datetime.strptime(
-                        value, '%Y-%m-%dT%H:%M:%S.%f')
+            now = None
+            for key in ("id", "created_at", "updated_at"):
+                if key not in kwargs:
+                    if key == "id":
+                        value = str(uuid.uuid4())
+                    else:
+                        value = now = now or datetime.now()
+                elif key == "id":
+                    value = kwargs[key]
                 else:
-                    self.__dict__[key] = value
+                    value = parse_datetime(kwargs[key])
+                store(key, value)
+            for key, value in kwargs.items():
+                if key not in ("id", "created_at", "updated_at"):
+                    store(key, value)
         else:
+            store("id", str(uuid.uuid4()))
+            store("created_at", datetime.now())
+            store("updated_at", datetime.now())
             models.storage.new(self)
 
+    def __setattr__(self, name, value):
+        """Set an attribute and flag the instance as dirty in storage."""
+        if COMPACT:
+            self.__store(name, value)
+        else:
+            super().__setattr__(name, value)
+        models.storage.touch(self, name)
+
+    if COMPACT:
+        def __store(self, name, value):
+            """Set a slot, or an overflow attribute if name is not a
+            field of the class."""
+            member = self._members.get(name)
+            if member is not None:
+                member.__set__(self, value)
+            elif self._extra is None:
+                object.__setattr__(self, "_extra", {name: value})
+            else:
+                self._extra[name] = value
+
+        def __getattr__(self, name):
+            """Look an attribute that is not a field up in the overflow
+            dict."""
+            if name != "_extra":
+                extra = self._extra
+                if extra is not None and name in extra:
+                    return extra[name]
+            raise AttributeError(f"'{type(self).__name__}' object has no"
+                                 f" attribute '{name}'")
+
+        def __delattr__(self, name):
+            """Delete a slot or an overflow attribute."""
+            if name in self._members:
+                self._members[name].__delete__(self)
+            elif self._extra is not None and name in self._extra:
+                del self._extra[name]
+            else:
+                raise AttributeError(name)
+            models.storage.touch(self, name)
+
+        @property
+        def __dict__(self):
+            """A new dict of the attributes set on the instance, as the
+            __dict__ of a non-compact model would hold them."""
+            attrs = {}
+            for name, member in self._members.items():
+                try:
+                    attrs[name] = member.__get__(self)
+                except AttributeError:
+                    pass
+            if self._extra is not None:
+                attrs.update(self._extra)
+            return attrs
+
     def __str__(self):
         """Return the print/str representation of the BaseModel instance.
             [<class name>] (<self.id>) <self.__dict__>"""
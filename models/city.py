@@ -6,5 +6,7 @@ from models.base_model import BaseModel
 class City(BaseModel):
     """Represent a city."""
 
+    _indexed = ("state_id",)
+
     state_id = ""
     name = ""
@@ -0,0 +1,114 @@
+#!/usr/bin/python3
+"""binary snapshot of the stored objects with an on-disk hash table
+
+    Layout, all integers little-endian:
+        header  magic b"HBNBSNAP", record count, slot count and the
+                offset of the table (4 x 8 bytes)
+        records key length, value length (2 x 4 bytes), the "Class.id"
+                key and its to_dict() JSON, both UTF-8
+        table   slot count slots of (key hash, record offset), an
+                offset of 0 marking an empty slot (open addressing)
+
+    Snapshot reads the file through mmap, so looking one key up only
+    touches the header, a few table slots and that record.
+    """
+import hashlib
+import mmap
+import struct
+
+MAGIC = b"HBNBSNAP"
+_header = struct.Struct("<8sQQQ")
+_record = struct.Struct("<II")
+_slot = struct.Struct("<QQ")
+
+
+def _hash(key):
+    """_hash: a 64-bit hash of key that is stable across processes."""
+    digest = hashlib.blake2b(key, digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def write(f, records):
+    """write: writes a snapshot of records to the binary file f.
+
+    :param f: a file object opened for writing in binary mode
+    :param records: an iterable of ("Class.id", JSON text) pairs
+    """
+    f.write(_header.pack(MAGIC, 0, 0, 0))
+    offset = _header.size
+    entries = []
+    for key, text in records:
+        key = key.encode("utf-8")
+        text = text.encode("utf-8")
+        f.write(_record.pack(len(key), len(text)) + key + text)
+        entries.append((_hash(key), offset))
+        offset += _record.size + len(key) + len(text)
+    slots = 1
+    while slots < 2 * len(entries):
+        slots *= 2
+    table = bytearray(slots * _slot.size)
+    for h, record in entries:
+        i = h & (slots - 1)
+        while _slot.unpack_from(table, i * _slot.size)[1]:
+            i = (i + 1) & (slots - 1)
+        _slot.pack_into(table, i * _slot.size, h, record)
+    f.write(table)
+    f.seek(0)
+    f.write(_header.pack(MAGIC, len(entries), slots, offset))
+
+
+class Snapshot:
+    """Snapshot: read-only access to a binary snapshot file."""
+
+    def __init__(self, path):
+        """__init__: maps the file at path into memory.
+
+        :param path: the snapshot file
+        """
+        with open(path, "rb") as f:
+            self.__map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.__slots, self.__table = \
+            _header.unpack_from(self.__map)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a binary snapshot")
+
+    def get(self, key):
+        """get: returns the JSON text stored for key, or None.
+
+        :param key: the "Class.id" key
+        """
+        key = key.encode("utf-8")
+        h = _hash(key)
+        i = h & (self.__slots - 1)
+        while True:
+            slot_hash, offset = _slot.unpack_from(
+                self.__map, self.__table + i * _slot.size)
+            if not offset:
+                return None
+            if slot_hash == h:
+                found, text = self.__read(offset)
+                if found == key:
+                    return text.decode("utf-8")
+            i = (i + 1) & (self.__slots - 1)
+
+    def __iter__(self):
+        """__iter__: yields every ("Class.id", JSON text) pair in file
+        order."""
+        offset = _header.size
+        while offset < self.__table:
+            key, text = self.__read(offset)
+            yield key.decode("utf-8"), text.decode("utf-8")
+            offset += _record.size + len(key) + len(text)
+
+    def __read(self, offset):
+        """__read: returns the key and JSON bytes of the record at
+        offset."""
+        key_len, text_len = _record.unpack_from(self.__map, offset)
+        start = offset + _record.size
+        return (self.__map[start:start + key_len],
+                self.__map[start + key_len:start + key_len + text_len])
+
+    def close(self):
+        """close: unmaps the file."""
+        self.__map.close()
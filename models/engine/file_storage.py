@@ -2,50 +2,1065 @@
 """serializes instances to a JSON file and
     deserializes JSON file to instances
     """
+import atexit
+import bz2
+import glob
+import gzip
+import io
 import json as j
-from models.base_model import BaseModel
-from models.user import User
-from models.state import State
-from models.city import City
-from models.amenity import Amenity
-from models.place import Place
-from models.review import Review
+import lzma
+import os
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from contextlib import contextmanager, nullcontext
+from models.engine import binary_snapshot, query
+from models.engine.json_stream import iter_members
+from models.engine.rwlock import RWLock
+from models.engine.stats import Stats
+from models.base_model import classes
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+_openers = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open,
+            ".lzma": lzma.open}
+_suffixes = {"gzip": ".gz", "bz2": ".bz2", "lzma": ".xz"}
+_unlocked = nullcontext()
+_umask = os.umask(0)
+os.umask(_umask)
 
 
 class FileStorage:
-    """FileStorage: a way to store the objects created."""
+    """FileStorage: a way to store the objects created.
+
+    Every object changed since the last save is kept in the dirty set
+    __changes, filled by new(), delete() and attribute assignment on
+    BaseModel instances (see touch()). A full save only encodes those;
+    the JSON of clean objects is reused from __cache.
+
+    __classes partitions __objects by class name so all(cls) only sees
+    the objects of that class, and __attrs maps (class name, attribute)
+    to {value: {key: obj}} for the attributes a model lists in _indexed,
+    which find() uses. Go through new() and delete() rather than editing
+    the dictionary returned by all(), or the indexes go stale.
+
+    In journal mode save() only appends the objects changed since the
+    last save, and a tombstone for each deleted one, to the log file
+    <__file_path>.log; reload() replays that log on top of the snapshot.
+    A save of several objects starts with a [null, <records>] header,
+    and a save cut short by a crash is dropped whole rather than
+    replayed in part.
+
+    format picks the snapshot written by compact(): "json" (__file_path),
+    "binary" (__file_path with a .bin extension, see binary_snapshot) or
+    "both". reload() only maps a binary snapshot into memory: get() then
+    builds the one object asked for and the other accessors load the
+    rest the first time they need it. Objects already in memory take
+    precedence over the mapped snapshot, and __deleted hides the keys
+    deleted since it was written.
+
+    In write-behind mode save() returns at once and a background thread
+    writes the changes, every flush_interval seconds or as soon as
+    flush_changes objects are dirty. flush() writes them right away and
+    close() also stops the thread; it runs at exit too. __lock guards
+    the state shared with that thread and __write_lock orders writes.
+
+    In thread-safe mode __lock, a threading.RLock otherwise, becomes a
+    reader/writer lock (see rwlock) that every change holds for writing
+    and the accessors hold for reading, so any number of threads read
+    at once but never while an object is added or removed, and all()
+    and where() work on a copy taken under it: iterating their result
+    cannot fail when another thread changes the storage. The files are
+    written without it. Like the objects, the mode is shared by every
+    FileStorage; switch it before threads use the storage.
+
+    Snapshots are written to a temporary file renamed over the old one,
+    so a crash leaves either the old or the new snapshot, never a part.
+    durability sets what save() waits for: "none" for nothing more,
+    "flush" for the data of the files it wrote to reach the disk (so the
+    rename cannot outlive them on a power loss) and "fsync" for the
+    directory as well, so the save itself survives one.
+
+    shards splits the JSON snapshot into one file per shard named
+    <__file_path base>.<shard>.json: "class" makes a shard of each
+    class, a number n spreads the objects over n buckets of their ids.
+    save() then only rewrites the shards holding a dirty object, and
+    reload() only lists the shard files: __shards keeps the unloaded
+    ones, read the first time an accessor needs one of their objects.
+    Each shard is replaced on its own, so a crash during a save can
+    leave some of its shards written and not the others.
+
+    JSON snapshots and shards are compressed when their path ends with
+    .gz, .bz2, .xz or .lzma, and compression ("gzip", "bz2" or "lzma")
+    adds that extension to __file_path and the shard paths. The data
+    goes through the compressor while it is written or parsed, never
+    sitting in memory whole. The log and the binary snapshot, which is
+    mapped into memory, are never compressed.
+
+    With statistics enabled (HBNB_STORAGE_STATS=1 or enable_stats())
+    the storage counts its calls, the bytes it writes and reads and the
+    objects it serializes and builds, and times each phase of save()
+    and reload(); stats() returns them.
+
+    In locking mode several processes can share the JSON snapshot: a
+    save() holds an exclusive fcntl lock on <__file_path>.lock while it
+    merges the snapshot other processes wrote since this one last read
+    or wrote it (__seen tells), then rewrites it whole, never appending
+    to the log. An object changed or deleted here wins over the other
+    process's version of it. Readers take no lock, since the snapshot
+    is renamed in place. Sharded snapshots are not merged.
+    """
 
     __file_path = "file.json"
     __objects = {}
+    __changes = {}
+    __cache = {}
+    __classes = {}
+    __attrs = {}
+    __values = {}
+    __indexed = None
+    __mapped = None
+    __mapped_for = None
+    __deleted = set()
+    __shards = {}
+    __shards_for = None
+    __batch = 0
+    __deferred = False
+    __log_records = 0
+    __seen = None
+    __known = set()
+    __lock = threading.RLock()
+    __write_lock = threading.RLock()
+    compact_min = 1000
+    chunk_size = 1 << 16
+
+    def __init__(self):
+        """__init__: reads the storage options from the environment."""
+        self.journal = os.getenv("HBNB_FILE_JOURNAL", "0") == "1"
+        self.format = os.getenv("HBNB_FILE_FORMAT", "json")
+        self.durability = os.getenv("HBNB_FILE_DURABILITY", "none")
+        self.shards = os.getenv("HBNB_FILE_SHARDS")
+        self.compression = os.getenv("HBNB_FILE_COMPRESSION")
+        self.write_behind = os.getenv("HBNB_FILE_WRITE_BEHIND", "0") == "1"
+        self.flush_interval = float(
+            os.getenv("HBNB_FILE_FLUSH_INTERVAL", "1"))
+        self.flush_changes = int(os.getenv("HBNB_FILE_FLUSH_CHANGES", "1000"))
+        self.locking = os.getenv("HBNB_FILE_LOCKING", "0") == "1"
+        if os.getenv("HBNB_FILE_THREAD_SAFE", "0") == "1":
+            self.thread_safe = True
+        self.__unflushed = False
+        self.__flusher = None
+        self.__closing = False
+        self.__wakeup = threading.Condition()
+        self.__stats = None
+        self.enable_stats(os.getenv("HBNB_STORAGE_STATS", "0") == "1")
+
+    @property
+    def thread_safe(self):
+        """thread_safe: tells whether __lock is a reader/writer lock."""
+        return type(FileStorage.__lock) is RWLock
 
-    def all(self):
-        """all returns the dictionary __objects."""
-        return FileStorage.__objects
+    @thread_safe.setter
+    def thread_safe(self, enabled):
+        """thread_safe: swaps __lock for a reader/writer lock, or back for
+        a threading.RLock.
+
+        :param enabled: True for the reader/writer lock
+        """
+        if enabled != self.thread_safe:
+            FileStorage.__lock = RWLock() if enabled else threading.RLock()
+
+    def all(self, cls=None):
+        """all returns the dictionary __objects, or only the objects of
+        the class cls; a copy of it in thread-safe mode.
+
+        :param cls: a class or class name, None for every object
+        """
+        if self.__stats is not None:
+            self.__stats.count("calls.all")
+        if cls is not None and not isinstance(cls, str):
+            cls = cls.__name__
+        self.__load_mapped()
+        self.__load_shards(cls)
+        with self.__reading():
+            if cls is None:
+                objs = FileStorage.__objects
+            else:
+                objs = self.__partitions().get(cls, {})
+            return dict(objs) if self.thread_safe else objs
+
+    def count(self, cls=None):
+        """count: returns the number of objects, or of objects of the
+        class cls, from the size of __objects or of its partition.
+
+        :param cls: a class or class name, None for every object
+        """
+        if self.__stats is not None:
+            self.__stats.count("calls.count")
+        if cls is not None and not isinstance(cls, str):
+            cls = cls.__name__
+        self.__load_mapped()
+        self.__load_shards(cls)
+        with self.__reading():
+            if cls is None:
+                return len(FileStorage.__objects)
+            return len(self.__partitions().get(cls, ()))
+
+    def get(self, cls, id):
+        """get: returns the object of the class cls with this id, or None.
+
+        :param cls: a class or class name
+        :param id: the object id
+        """
+        if self.__stats is not None:
+            self.__stats.count("calls.get")
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        key = f"{cls}.{id}"
+        obj = FileStorage.__objects.get(key)
+        if obj is None and FileStorage.__shards:
+            self.__load_shards(names=[self.__shard(key)])
+            obj = FileStorage.__objects.get(key)
+        if obj is None and FileStorage.__mapped is not None:
+            with FileStorage.__lock:
+                return self.__get_mapped(key)
+        return obj
+
+    def __get_mapped(self, key):
+        """__get_mapped: returns the object under key, building it from
+        the mapped snapshot if it is not in memory yet."""
+        obj = FileStorage.__objects.get(key)
+        if obj is None and self.__snapshot() is not None:
+            text = None
+            if key not in FileStorage.__deleted:
+                text = FileStorage.__mapped.get(key)
+            if text is not None:
+                obj = self.__build(j.loads(text))
+                self.__put(key, obj)
+                FileStorage.__cache[key] = (obj, text)
+        return obj
 
     def new(self, obj):
         """new: sets in __objects the obj with key clsName.id.
 
         :param obj: the object
         """
+        if self.__stats is not None:
+            self.__stats.count("calls.new")
+        key = f"{obj.__class__.__name__}.{obj.id}"
+        with FileStorage.__lock:
+            self.__put(key, obj)
+            FileStorage.__changes[key] = obj
+
+    def delete(self, obj=None):
+        """delete: removes obj from __objects if it is there.
+
+        :param obj: the object
+        """
+        if self.__stats is not None:
+            self.__stats.count("calls.delete")
+        if obj is None:
+            return
         key = f"{obj.__class__.__name__}.{obj.id}"
+        with FileStorage.__lock:
+            if self.__pop(key) is not None:
+                FileStorage.__changes[key] = None
+                FileStorage.__cache.pop(key, None)
+
+    def touch(self, obj, name=None):
+        """touch: flags obj as changed since the last save.
+
+        BaseModel calls it on every attribute assignment; call it by hand
+        after changing a mutable attribute in place (a list, a dict).
+
+        :param obj: the object
+        :param name: the attribute that changed, None if unknown
+        """
+        key = f"{obj.__class__.__name__}.{obj.id}"
+        if FileStorage.__objects.get(key) is not obj:
+            return
+        with FileStorage.__lock:
+            FileStorage.__changes[key] = obj
+            if name is None or name in obj._indexed:
+                self.__partitions()
+                self.__unindex(key)
+                self.__index(key, obj)
+
+    def find(self, cls, **attrs):
+        """find: returns the dictionary of the objects of the class cls
+        whose attributes equal attrs, e.g. find(Review, place_id=id).
+
+        The smallest matching bucket of an indexed attribute is used
+        when there is one; otherwise the objects of cls are scanned.
+
+        :param cls: a class or class name
+        """
+        if self.__stats is not None:
+            self.__stats.count("calls.find")
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        self.__load_mapped()
+        self.__load_shards(cls)
+        with self.__reading():
+            candidates = self.__candidates(cls, attrs.items())
+            return {key: obj for key, obj in candidates.items()
+                    if all(getattr(obj, attr, None) == value
+                           for attr, value in attrs.items())}
+
+    def where(self, cls, *conditions):
+        """where: yields the objects of the class cls that meet every
+        condition, e.g. where(Place, ("city_id", "=", id),
+        ("price_by_night", "<", 100)); see models.engine.query.
+
+        Candidates are picked as in find() from the equality conditions,
+        then checked one at a time as they are yielded; in thread-safe
+        mode, from a list of them taken when the iteration starts.
+
+        :param cls: a class or class name
+        """
+        if self.__stats is not None:
+            self.__stats.count("calls.where")
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        conditions = query.check(conditions)
+        self.__load_mapped()
+        self.__load_shards(cls)
+        with self.__reading():
+            candidates = self.__candidates(
+                cls, query.equalities(conditions)).values()
+            if self.thread_safe:
+                candidates = list(candidates)
+        for obj in candidates:
+            if query.matches(obj, conditions):
+                yield obj
+
+    def __candidates(self, cls, pairs):
+        """__candidates: returns the smallest bucket of an indexed
+        attribute among the (attribute, value) pairs, or every object of
+        the class named cls if none of them is indexed."""
+        candidates = self.__partitions().get(cls, {})
+        for attr, value in pairs:
+            index = FileStorage.__attrs.get((cls, attr))
+            if index is not None:
+                try:
+                    bucket = index.get(value, {})
+                except TypeError:
+                    continue
+                if len(bucket) < len(candidates):
+                    candidates = bucket
+        return candidates
+
+    def __reading(self):
+        """__reading: returns what holds __lock for reading in thread-safe
+        mode, once the indexes are up to date, and nothing otherwise."""
+        if not self.thread_safe:
+            return _unlocked
+        if FileStorage.__indexed is not FileStorage.__objects:
+            with FileStorage.__lock:
+                self.__partitions()
+        return FileStorage.__lock.read()
+
+    def __partitions(self):
+        """__partitions: returns __classes, rebuilding every index first
+        if __objects has been replaced since it was last indexed."""
+        if FileStorage.__indexed is not FileStorage.__objects:
+            FileStorage.__classes = {}
+            FileStorage.__attrs = {}
+            FileStorage.__values = {}
+            FileStorage.__indexed = FileStorage.__objects
+            for key, obj in FileStorage.__objects.items():
+                FileStorage.__classes.setdefault(
+                    key.split(".", 1)[0], {})[key] = obj
+                self.__index(key, obj)
+        return FileStorage.__classes
+
+    def __index(self, key, obj):
+        """__index: adds obj to the index of each of its _indexed
+        attributes whose value is hashable."""
+        if not obj._indexed:
+            return
+        name = key.split(".", 1)[0]
+        values = []
+        for attr in obj._indexed:
+            value = getattr(obj, attr, None)
+            try:
+                FileStorage.__attrs.setdefault((name, attr), {}).setdefault(
+                    value, {})[key] = obj
+            except TypeError:
+                continue
+            values.append((attr, value))
+        FileStorage.__values[key] = values
+
+    def __unindex(self, key):
+        """__unindex: removes key from the attribute indexes."""
+        name = key.split(".", 1)[0]
+        for attr, value in FileStorage.__values.pop(key, ()):
+            index = FileStorage.__attrs[(name, attr)]
+            index[value].pop(key, None)
+            if not index[value]:
+                del index[value]
+
+    def __put(self, key, obj):
+        """__put: stores obj under key in __objects and its indexes."""
+        self.__partitions().setdefault(key.split(".", 1)[0], {})[key] = obj
+        self.__unindex(key)
+        self.__index(key, obj)
         FileStorage.__objects[key] = obj
 
+    def __pop(self, key):
+        """__pop: removes key from __objects and its indexes, returning
+        the object that was stored there, if any."""
+        partition = self.__partitions().get(key.split(".", 1)[0], {})
+        partition.pop(key, None)
+        self.__unindex(key)
+        if self.__snapshot() is not None:
+            FileStorage.__deleted.add(key)
+        return FileStorage.__objects.pop(key, None)
+
+    def __build(self, obj):
+        """__build: returns the instance described by a to_dict()
+        dictionary, its class looked up in the model registry."""
+        if self.__stats is not None:
+            self.__stats.count("objects.built")
+        return classes[obj.pop("__class__")](**obj)
+
+    def __snapshot(self):
+        """__snapshot: returns the mapped binary snapshot, if any, once
+        checked that __objects was not replaced since it was mapped."""
+        if FileStorage.__mapped is None:
+            return None
+        if FileStorage.__mapped_for is not FileStorage.__objects:
+            self.__unmap()
+        return FileStorage.__mapped
+
+    def __map(self, path):
+        """__map: maps the binary snapshot at path in place of the
+        current one."""
+        self.__unmap()
+        FileStorage.__mapped = binary_snapshot.Snapshot(path)
+        FileStorage.__mapped_for = FileStorage.__objects
+
+    def __unmap(self):
+        """__unmap: forgets the mapped binary snapshot."""
+        if FileStorage.__mapped is not None:
+            FileStorage.__mapped.close()
+        FileStorage.__mapped = None
+        FileStorage.__mapped_for = None
+        FileStorage.__deleted = set()
+
+    def __load_mapped(self):
+        """__load_mapped: builds every object of the mapped snapshot that
+        is not in memory yet, then unmaps it."""
+        if FileStorage.__mapped is None:
+            return
+        with FileStorage.__lock:
+            mapped = self.__snapshot()
+            if mapped is None:
+                return
+            for key, text in mapped:
+                if (key not in FileStorage.__objects and
+                        key not in FileStorage.__deleted):
+                    obj = self.__build(j.loads(text))
+                    self.__put(key, obj)
+                    FileStorage.__cache[key] = (obj, text)
+            self.__unmap()
+
+    def __shard(self, key):
+        """__shard: returns the name of the shard holding key."""
+        name, id = key.split(".", 1)
+        if self.shards == "class":
+            return name
+        return str(zlib.crc32(id.encode("utf-8")) % int(self.shards))
+
+    def __shard_path(self, name):
+        """__shard_path: returns the path of the shard file name."""
+        return self.__json_path(f"{self.__base()}.{name}.json")
+
+    def __shard_files(self):
+        """__shard_files: returns {shard name: path} for every shard
+        file on disk."""
+        base = self.__base()
+        end = len(self.__json_path(".json"))
+        return {path[len(base) + 1:-end]: path
+                for path in glob.glob(glob.escape(base) +
+                                      self.__json_path(".*.json"))}
+
+    def __load_shards(self, cls=None, names=None):
+        """__load_shards: reads the unloaded shards that may hold objects
+        of the class cls (any class if None) or, if given, the shards
+        named in names."""
+        if not FileStorage.__shards:
+            return
+        with FileStorage.__lock:
+            if FileStorage.__shards_for is not FileStorage.__objects:
+                FileStorage.__shards = {}
+            if names is None:
+                if cls is not None and self.shards == "class":
+                    names = [cls]
+                else:
+                    names = list(FileStorage.__shards)
+            for name in names:
+                path = FileStorage.__shards.pop(name, None)
+                if path is None:
+                    continue
+                start = time.perf_counter()
+                with self.__open(path) as f:
+                    for key, obj, text in iter_members(f, self.chunk_size):
+                        if key not in FileStorage.__objects:
+                            obj = self.__build(obj)
+                            self.__put(key, obj)
+                            FileStorage.__cache[key] = (obj, text)
+                if self.__stats is not None:
+                    self.__stats.count("bytes.read", os.path.getsize(path))
+                    self.__stats.add_time("reload.shard", start)
+
+    def __save_shards(self, full=False):
+        """__save_shards: rewrites the shard files holding an object
+        changed since the last save, or all of them if full."""
+        with FileStorage.__write_lock:
+            start = time.perf_counter()
+            with FileStorage.__lock:
+                if full:
+                    self.__load_shards()
+                    names = {self.__shard(key)
+                             for key in FileStorage.__objects}
+                    names.update(self.__shard_files())
+                else:
+                    names = {self.__shard(key)
+                             for key in FileStorage.__changes}
+                    self.__load_shards(names=names)
+                shards = {name: [] for name in names}
+                for key, obj in FileStorage.__objects.items():
+                    records = shards.get(self.__shard(key))
+                    if records is not None:
+                        records.append((key, self.__encode(key, obj)))
+                changes = self.__take_changes()
+            if self.__stats is not None:
+                start = self.__stats.add_time("save.encode", start)
+            try:
+                for name, records in shards.items():
+                    path = self.__shard_path(name)
+                    if records:
+                        self.__dump(path, records)
+                        continue
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+            except BaseException:
+                self.__restore_changes(changes)
+                raise
+            if self.__stats is not None:
+                self.__stats.add_time("save.write", start)
+
+    def stats(self):
+        """stats: returns the counters and the timers, each timer as
+        {"calls": n, "seconds": total}, or None if they are disabled."""
+        if self.__stats is None:
+            return None
+        return self.__stats.as_dict()
+
+    def enable_stats(self, enabled=True):
+        """enable_stats: starts collecting statistics from zero, or stops.
+
+        :param enabled: False to stop and forget them
+        """
+        self.__stats = Stats() if enabled else None
+
+    @contextmanager
+    def batch(self):
+        """batch: defers the save() calls made inside the with block to a
+        single save when the outermost batch exits.
+
+        If the block raises, nothing is saved: the changes stay in memory
+        and dirty, for the next save() to write.
+        """
+        FileStorage.__batch += 1
+        try:
+            yield self
+        finally:
+            FileStorage.__batch -= 1
+        if not FileStorage.__batch and FileStorage.__deferred:
+            self.save()
+
     def save(self):
-        """save: serializes __objects to the JSON file."""
-        obj_dic = FileStorage.__objects
-        all_obj = {obj: obj_dic[obj].to_dict() for obj in obj_dic.keys()}
-        with open(FileStorage.__file_path, "w", encoding="utf-8") as f:
-            j.dump(all_obj, f)
+        """save: serializes __objects to the JSON file, or only records
+        that it has to when a batch is open or in write-behind mode."""
+        if self.__stats is not None:
+            self.__stats.count("calls.save")
+        FileStorage.__deferred = FileStorage.__batch > 0
+        if FileStorage.__deferred:
+            return
+        if not self.write_behind:
+            self.__write()
+            return
+        with self.__wakeup:
+            self.__unflushed = True
+            if self.__flusher is None:
+                self.__flusher = threading.Thread(
+                    target=self.__flush_loop, name="FileStorage.flusher",
+                    daemon=True)
+                self.__flusher.start()
+                atexit.register(self.close)
+            if len(FileStorage.__changes) >= self.flush_changes:
+                self.__wakeup.notify()
+
+    def flush(self):
+        """flush: writes the saves write-behind mode still holds back,
+        or waits for the write-behind thread to finish writing them. If
+        the write fails they are still held back, for the next flush."""
+        with FileStorage.__write_lock:
+            with self.__wakeup:
+                unflushed = self.__unflushed
+                self.__unflushed = False
+            if unflushed:
+                try:
+                    self.__write()
+                except BaseException:
+                    with self.__wakeup:
+                        self.__unflushed = True
+                    raise
+
+    def close(self):
+        """close: stops the write-behind thread, then flushes."""
+        with self.__wakeup:
+            flusher = self.__flusher
+            self.__closing = True
+            self.__wakeup.notify()
+        if flusher is not None:
+            flusher.join()
+        with self.__wakeup:
+            self.__flusher = None
+            self.__closing = False
+        atexit.unregister(self.close)
+        self.flush()
+
+    def __flush_loop(self):
+        """__flush_loop: body of the write-behind thread. A failed flush
+        is reported on stderr and tried again after flush_interval."""
+        while True:
+            with self.__wakeup:
+                if not self.__closing:
+                    self.__wakeup.wait(self.flush_interval)
+                if self.__closing:
+                    return
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"** write-behind flush failed: {e!r} **",
+                      file=sys.stderr)
+
+    def __write(self):
+        """__write: rewrites the dirty shards in sharded mode, appends to
+        the log in journal mode unless locking and compacts otherwise."""
+        start = time.perf_counter()
+        if self.shards:
+            self.__save_shards()
+        elif self.journal and not self.locking:
+            self.__append()
+        else:
+            self.compact()
+        if self.__stats is not None:
+            self.__stats.add_time("save", start)
+
+    def compact(self):
+        """compact: rewrites the whole snapshot and drops the log.
+
+        The records of a mapped binary snapshot that were never loaded
+        are copied as they are, without building their objects. Only the
+        encoding holds __lock; the file is written without it. In
+        sharded mode every shard is rewritten instead, and in locking
+        mode the snapshot on disk is merged first.
+        """
+        if self.shards:
+            self.__save_shards(True)
+            return
+        with FileStorage.__write_lock, self.__locked():
+            start = time.perf_counter()
+            with FileStorage.__lock:
+                if self.locking:
+                    self.__merge()
+                    if self.__stats is not None:
+                        start = self.__stats.add_time("save.merge", start)
+                records = list(self.__records())
+                changes = self.__take_changes()
+            if self.__stats is not None:
+                start = self.__stats.add_time("save.encode", start)
+            try:
+                if self.format != "binary":
+                    path = self.__json_path(FileStorage.__file_path)
+                    self.__dump(path, records)
+                    if self.locking:
+                        FileStorage.__seen = self.__version(os.stat(path))
+                        FileStorage.__known = {key for key, text in records}
+                if self.format != "json":
+                    path = self.__base()
+                    with self.__temp(path + ".bin") as f:
+                        binary_snapshot.write(f, records)
+                        self.__sync(f)
+                    if self.__stats is not None:
+                        self.__stats.count("bytes.written",
+                                           os.path.getsize(path + ".bin"))
+                    with FileStorage.__lock:
+                        if self.__snapshot() is not None:
+                            self.__map(path + ".bin")
+                            FileStorage.__deleted.update(
+                                key for key, obj in
+                                FileStorage.__changes.items() if obj is None)
+                try:
+                    os.remove(FileStorage.__file_path + ".log")
+                except FileNotFoundError:
+                    pass
+                else:
+                    self.__sync_dir(FileStorage.__file_path)
+            except BaseException:
+                self.__restore_changes(changes)
+                raise
+            FileStorage.__log_records = 0
+            if self.__stats is not None:
+                self.__stats.add_time("save.write", start)
+
+    @contextmanager
+    def __locked(self):
+        """__locked: holds the lock file of __file_path exclusively for
+        the with block in locking mode, waiting for other processes."""
+        if not self.locking:
+            yield
+            return
+        if fcntl is None:
+            raise OSError("file locking needs the fcntl module")
+        with open(FileStorage.__file_path + ".lock", "a") as f:
+            start = time.perf_counter()
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            if self.__stats is not None:
+                self.__stats.add_time("save.lock", start)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    def __version(self, stat):
+        """__version: returns the inode, size and modification time of
+        a snapshot's os.stat(), which change whenever one is written."""
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def __merge(self):
+        """__merge: applies to __objects the JSON snapshot on disk if it
+        changed since __seen, except for the objects of the dirty set.
+
+        Objects it adds or changes are built and objects of __known it
+        lacks are dropped; the others keep their instances.
+        """
+        try:
+            f = self.__open(self.__json_path(FileStorage.__file_path))
+        except FileNotFoundError:
+            return
+        with f:
+            version = self.__version(os.fstat(f.fileno()))
+            if version == FileStorage.__seen:
+                return
+            changes = FileStorage.__changes
+            keys = set()
+            for key, obj, text in iter_members(f, self.chunk_size):
+                keys.add(key)
+                if key in changes:
+                    continue
+                hit = FileStorage.__cache.get(key)
+                if (hit is not None and hit[1] == text and
+                        FileStorage.__objects.get(key) is hit[0]):
+                    continue
+                obj = self.__build(obj)
+                self.__put(key, obj)
+                FileStorage.__cache[key] = (obj, text)
+        for key in FileStorage.__known - keys:
+            if key not in changes and self.__pop(key) is not None:
+                FileStorage.__cache.pop(key, None)
+        FileStorage.__seen = version
+        FileStorage.__known = keys
+
+    def __base(self):
+        """__base: returns __file_path without its extensions."""
+        path = FileStorage.__file_path
+        if os.path.splitext(path)[1] in _openers:
+            path = os.path.splitext(path)[0]
+        return os.path.splitext(path)[0]
+
+    def __json_path(self, path):
+        """__json_path: returns path with the extension of compression,
+        unless it has one of a compressed file already."""
+        if not self.compression or os.path.splitext(path)[1] in _openers:
+            return path
+        return path + _suffixes[self.compression]
+
+    def __open(self, path):
+        """__open: opens the JSON file at path for reading as text,
+        decompressing it if its extension says it is compressed."""
+        opener = _openers.get(os.path.splitext(path)[1], open)
+        return opener(path, "rt", encoding="utf-8")
+
+    def __dump(self, path, records):
+        """__dump: writes the records as a JSON object to a temporary
+        file, compressed if the extension of path asks for it, and
+        renames it to path."""
+        with self.__temp(path) as raw:
+            opener = _openers.get(os.path.splitext(path)[1])
+            if opener is None:
+                f = io.TextIOWrapper(raw, encoding="utf-8")
+            else:
+                f = opener(raw, "wt", encoding="utf-8")
+            f.write("{")
+            f.writelines(f"{', ' if i else ''}{j.dumps(key)}: {text}"
+                         for i, (key, text) in enumerate(records))
+            f.write("}")
+            if opener is None:
+                f.detach()
+            else:
+                f.close()
+            self.__sync(raw)
+            if self.__stats is not None:
+                self.__stats.count("bytes.written", raw.tell())
+
+    @contextmanager
+    def __temp(self, path):
+        """__temp: yields a new temporary file next to path, open for
+        writing in binary, and renames it to path after the with block,
+        or removes it if the block raises. Each write gets its own file,
+        so concurrent writers never share one."""
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path) or ".",
+                                   prefix=os.path.basename(path) + ".",
+                                   suffix=".tmp")
+        try:
+            os.chmod(tmp, 0o666 & ~_umask)
+            with os.fdopen(fd, "wb") as f:
+                yield f
+            self.__replace(tmp, path)
+        except BaseException:
+            try:
+                os.remove(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def __sync(self, f):
+        """__sync: waits for the data written to f to reach the disk,
+        unless durability is "none"."""
+        if self.durability != "none":
+            start = time.perf_counter()
+            f.flush()
+            getattr(os, "fdatasync", os.fsync)(f.fileno())
+            if self.__stats is not None:
+                self.__stats.add_time("save.sync", start)
+
+    def __sync_dir(self, path):
+        """__sync_dir: waits for the directory entries of path to reach
+        the disk when durability is "fsync"."""
+        if self.durability == "fsync" and hasattr(os, "O_DIRECTORY"):
+            fd = os.open(os.path.dirname(os.path.abspath(path)),
+                         os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def __replace(self, tmp, path):
+        """__replace: renames the file tmp over path in one step."""
+        os.replace(tmp, path)
+        self.__sync_dir(path)
+
+    def __take_changes(self):
+        """__take_changes: empties the dirty set, returning what it held.
+        """
+        changes = FileStorage.__changes
+        FileStorage.__changes = {}
+        return changes
+
+    def __restore_changes(self, changes):
+        """__restore_changes: puts back in the dirty set the changes a
+        failed write took, unless they were superseded meanwhile."""
+        with FileStorage.__lock:
+            for key, obj in changes.items():
+                FileStorage.__changes.setdefault(key, obj)
+
+    def __records(self):
+        """__records: yields the key and JSON text of every object,
+        encoding only the dirty ones and reusing the others, followed by
+        the records of the mapped snapshot that are not in memory."""
+        for key, obj in FileStorage.__objects.items():
+            yield key, self.__encode(key, obj)
+        cache = FileStorage.__cache
+        if len(cache) > len(FileStorage.__objects):
+            FileStorage.__cache = {key: cache[key]
+                                   for key in FileStorage.__objects}
+        mapped = self.__snapshot()
+        if mapped is not None:
+            for key, text in mapped:
+                if (key not in FileStorage.__objects and
+                        key not in FileStorage.__deleted):
+                    yield key, text
+
+    def __encode(self, key, obj):
+        """__encode: returns the JSON text of obj, reused from __cache
+        unless obj is dirty."""
+        hit = FileStorage.__cache.get(key)
+        if hit is None or hit[0] is not obj or key in FileStorage.__changes:
+            hit = (obj, j.dumps(obj.to_dict()))
+            FileStorage.__cache[key] = hit
+            if self.__stats is not None:
+                self.__stats.count("objects.serialized")
+        return hit[1]
+
+    def __append(self):
+        """__append: writes one log line per object changed since the
+        last save, then compacts once the log outgrows the snapshot. The
+        text of each line also refreshes __cache, for compact() to reuse.
+        """
+        with FileStorage.__write_lock:
+            start = time.perf_counter()
+            with FileStorage.__lock:
+                obj_dic = FileStorage.__objects
+                lines = []
+                cache = FileStorage.__cache
+                for key, obj in FileStorage.__changes.items():
+                    if obj is None:
+                        lines.append(j.dumps([key, None]) + "\n")
+                        cache.pop(key, None)
+                    elif obj_dic.get(key) is obj:
+                        text = j.dumps(obj.to_dict())
+                        cache[key] = (obj, text)
+                        lines.append(f"[{j.dumps(key)}, {text}]\n")
+                if len(lines) > 1:
+                    lines.insert(0, f"[null, {len(lines)}]\n")
+                changes = self.__take_changes()
+                size = len(obj_dic)
+                if self.__snapshot() is not None:
+                    size += FileStorage.__mapped.count
+            if not lines:
+                return
+            records = len(lines) - (len(lines) > 1)
+            if self.__stats is not None:
+                self.__stats.count("objects.serialized", records)
+                start = self.__stats.add_time("save.encode", start)
+            try:
+                path = FileStorage.__file_path + ".log"
+                created = not os.path.exists(path)
+                data = "".join(lines).encode("utf-8")
+                with open(path, "ab") as f:
+                    f.write(data)
+                    self.__sync(f)
+                if self.__stats is not None:
+                    self.__stats.count("bytes.written", len(data))
+                if created:
+                    self.__sync_dir(path)
+            except BaseException:
+                self.__restore_changes(changes)
+                raise
+            if self.__stats is not None:
+                self.__stats.add_time("save.write", start)
+            FileStorage.__log_records += records
+            if FileStorage.__log_records > max(self.compact_min, size):
+                self.compact()
 
     def reload(self):
         """reload: Deserialize the JSON file\
-__file_path to __objects, if it exists."""
+__file_path to __objects, if it exists.
+
+        The file is parsed one member at a time and each object is built
+        as soon as its member is read, so the raw dict tree of the whole
+        file never sits in memory next to the objects. Unless format is
+        "json", a binary snapshot is mapped instead when there is one.
+        In sharded mode the shards are only listed, to be read on demand.
+        """
+        if self.__stats is not None:
+            self.__stats.count("calls.reload")
+        start = time.perf_counter()
+        with FileStorage.__write_lock, FileStorage.__lock:
+            self.__reload()
+        if self.__stats is not None:
+            self.__stats.add_time("reload", start)
+
+    def __reload(self):
+        """__reload: lists the shards, or maps the binary snapshot or
+        reads the JSON one, then replays the log."""
+        if self.shards:
+            FileStorage.__shards = self.__shard_files()
+            FileStorage.__shards_for = FileStorage.__objects
+            return
+        binary = self.__base() + ".bin"
+        if self.format != "json" and os.path.exists(binary):
+            self.__map(binary)
+            self.__replay()
+            return
+        path = self.__json_path(FileStorage.__file_path)
+        stats = self.__stats
+        FileStorage.__seen = None
+        FileStorage.__known = set()
+        try:
+            with self.__open(path) as f:
+                if self.locking:
+                    FileStorage.__seen = self.__version(os.fstat(f.fileno()))
+                start = time.perf_counter()
+                for key, obj, text in iter_members(f, self.chunk_size):
+                    if stats is not None:
+                        start = stats.add_time("reload.parse", start)
+                    obj = self.__build(obj)
+                    self.__put(key, obj)
+                    FileStorage.__cache[key] = (obj, text)
+                    if self.locking:
+                        FileStorage.__known.add(key)
+                    if stats is not None:
+                        start = stats.add_time("reload.build", start)
+            if stats is not None:
+                stats.count("bytes.read", os.path.getsize(path))
+        except FileNotFoundError:
+            pass
+        self.__replay()
+
+    def __replay(self):
+        """__replay: applies the log to __objects one save at a time,
+        cutting off a save torn by a crash during the last append: a
+        header and fewer records than it announces, or a partial line.
+        """
         try:
-            with open(FileStorage.__file_path) as f:
-                obj_dic = j.load(f)
-                for obj in obj_dic.values():
-                    clsName = obj["__class__"]
-                    del obj["__class__"]
-                    self.new(eval(clsName)(**obj))
+            f = open(FileStorage.__file_path + ".log", "rb+")
         except FileNotFoundError:
             return
+        with f:
+            records = 0
+            offset = 0
+            size = 0
+            expected = 0
+            batch = []
+            for line in f:
+                try:
+                    key, obj = j.loads(line)
+                except (TypeError, ValueError):
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                size += len(line)
+                if key is None:
+                    if batch or not isinstance(obj, int):
+                        break
+                    expected = obj
+                    continue
+                batch.append((key, obj))
+                if len(batch) < expected:
+                    continue
+                for key, obj in batch:
+                    if obj is None:
+                        self.__pop(key)
+                    else:
+                        self.__put(key, self.__build(obj))
+                records += len(batch)
+                offset = size
+                expected = 0
+                batch = []
+            if offset < os.fstat(f.fileno()).st_size:
+                f.truncate(offset)
+            if self.__stats is not None:
+                self.__stats.count("bytes.read", offset)
+        FileStorage.__log_records = records
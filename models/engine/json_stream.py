@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+"""incremental parser for the top-level JSON object of file.json
+
+    iter_members() reads the file chunk by chunk and yields one
+    "Class.id": {...} member at a time, so only the member being parsed
+    and one chunk of text are held in memory.
+    """
+import json as j
+import re
+
+_decoder = j.JSONDecoder()
+_ws = re.compile(r"[ \t\n\r]*")
+
+
+class _Reader:
+    """_Reader: a text buffer refilled from a file object on demand."""
+
+    def __init__(self, f, chunk_size):
+        """__init__.
+
+        :param f: a file object opened in text mode
+        :param chunk_size: the number of characters read at a time
+        """
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ""
+        self.pos = 0
+        self.mark = 0
+        self.eof = False
+
+    def fill(self):
+        """fill: drops the text before mark and reads the next chunk.
+
+        The read size doubles with the buffer, so a member larger than
+        chunk_size is only re-scanned a logarithmic number of times.
+        """
+        if self.eof:
+            raise j.JSONDecodeError("Unexpected end of file",
+                                    self.buf, self.pos)
+        self.buf = self.buf[self.mark:]
+        self.pos -= self.mark
+        self.mark = 0
+        chunk = self.f.read(max(self.chunk_size, len(self.buf)))
+        if not chunk:
+            self.eof = True
+        self.buf += chunk
+
+    def skip(self):
+        """skip: moves past whitespace and returns the next character."""
+        while True:
+            self.pos = _ws.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            self.fill()
+
+    def expect(self, char):
+        """expect: consumes char or raises JSONDecodeError."""
+        if self.skip() != char:
+            raise j.JSONDecodeError(f"Expecting '{char}'",
+                                    self.buf, self.pos)
+        self.pos += 1
+
+    def value(self):
+        """value: decodes the JSON value starting at pos."""
+        self.skip()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except j.JSONDecodeError:
+                if self.eof:
+                    raise
+                self.fill()
+                continue
+            if end == len(self.buf) and not self.eof:
+                self.fill()
+                continue
+            self.pos = end
+            return value
+
+
+def iter_members(f, chunk_size=1 << 16):
+    """iter_members: yields (key, value, text) for each member of the
+    top-level JSON object in f, text being the value's source JSON.
+
+    :param f: a file object opened in text mode
+    :param chunk_size: the number of characters read at a time
+    """
+    reader = _Reader(f, chunk_size)
+    reader.expect("{")
+    if reader.skip() == "}":
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        reader.skip()
+        reader.mark = reader.pos
+        value = reader.value()
+        yield key, value, reader.buf[reader.mark:reader.pos]
+        reader.mark = reader.pos
+        if reader.skip() == "}":
+            return
+        reader.expect(",")
@@ -0,0 +1,48 @@
+#!/usr/bin/python3
+"""conditions of the storage where() queries
+
+    A condition is an (attribute, operator, value) tuple, the operator
+    being one of the keys of operators, e.g. ("price_by_night", "<", 100).
+    """
+import operator
+
+operators = {"=": operator.eq, "==": operator.eq, "!=": operator.ne,
+             "<": operator.lt, "<=": operator.le, ">": operator.gt,
+             ">=": operator.ge}
+
+
+def check(conditions):
+    """check: returns the conditions as a list of tuples, or raises
+    ValueError if one of them has an unknown operator.
+
+    :param conditions: an iterable of (attribute, operator, value)
+    """
+    conditions = [tuple(condition) for condition in conditions]
+    for attr, op, value in conditions:
+        if op not in operators:
+            raise ValueError(f"unknown operator {op!r}")
+    return conditions
+
+
+def equalities(conditions):
+    """equalities: returns the (attribute, value) pairs of the equality
+    conditions, the ones an attribute index can answer."""
+    return [(attr, value) for attr, op, value in conditions
+            if operators[op] is operator.eq]
+
+
+def matches(obj, conditions):
+    """matches: tells whether obj meets every condition. A missing
+    attribute reads as None, and a comparison between values of types
+    that cannot be ordered is not met.
+
+    :param obj: the object
+    :param conditions: a list returned by check()
+    """
+    for attr, op, value in conditions:
+        try:
+            if not operators[op](getattr(obj, attr, None), value):
+                return False
+        except TypeError:
+            return False
+    return True
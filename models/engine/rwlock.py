@@ -0,0 +1,94 @@
+#!/usr/bin/python3
+"""a lock that readers share and writers hold alone
+
+    Used in a with statement an RWLock is taken for writing, reentrant
+    like a threading.RLock; read() takes it for reading. The thread
+    holding it for writing may read as well, but a reader must not ask
+    to write: it would wait for itself. Waiting writers go before new
+    readers, so a stream of readers cannot starve them.
+    """
+import threading
+
+
+class RWLock:
+    """RWLock: a reader/writer lock."""
+
+    def __init__(self):
+        """__init__: starts unlocked."""
+        self.__mutex = threading.Lock()
+        self.__cond = threading.Condition(self.__mutex)
+        self.__readers = 0
+        self.__writer = None
+        self.__writes = 0
+        self.__waiting = 0
+        self.__local = threading.local()
+        self.__reading = _Reading(self)
+
+    def __enter__(self):
+        """__enter__: waits for the readers and any other writer to
+        leave, then holds the lock for writing."""
+        me = threading.get_ident()
+        with self.__cond:
+            if self.__writer != me:
+                self.__waiting += 1
+                try:
+                    while self.__writer is not None or self.__readers:
+                        self.__cond.wait()
+                finally:
+                    self.__waiting -= 1
+                self.__writer = me
+            self.__writes += 1
+        return self
+
+    def __exit__(self, *exc):
+        """__exit__: releases one level of writing."""
+        with self.__cond:
+            self.__writes -= 1
+            if not self.__writes:
+                self.__writer = None
+                self.__cond.notify_all()
+
+    def read(self):
+        """read: returns a context manager holding the lock for reading
+        in its with block, along with the other readers."""
+        return self.__reading
+
+    def acquire_read(self):
+        """acquire_read: waits for the writers to leave, then holds the
+        lock for reading. Nested reads of a thread that already reads or
+        writes do not wait."""
+        local = self.__local
+        depth = getattr(local, "depth", 0)
+        if not depth and self.__writer != threading.get_ident():
+            with self.__mutex:
+                while self.__writer is not None or self.__waiting:
+                    self.__cond.wait()
+                self.__readers += 1
+        local.depth = depth + 1
+
+    def release_read(self):
+        """release_read: releases one level of reading."""
+        local = self.__local
+        local.depth -= 1
+        if not local.depth and self.__writer != threading.get_ident():
+            with self.__mutex:
+                self.__readers -= 1
+                if not self.__readers and self.__waiting:
+                    self.__cond.notify_all()
+
+
+class _Reading:
+    """_Reading: the read side of an RWLock, as a context manager."""
+
+    def __init__(self, lock):
+        """__init__: keeps the lock."""
+        self.__lock = lock
+
+    def __enter__(self):
+        """__enter__: holds the lock for reading."""
+        self.__lock.acquire_read()
+        return self
+
+    def __exit__(self, *exc):
+        """__exit__: releases one level of reading."""
+        self.__lock.release_read()
@@ -0,0 +1,344 @@
+#!/usr/bin/python3
+"""stores instances in a SQLite database, one table per class
+    """
+import json as j
+import os
+import sqlite3
+import time
+import weakref
+from contextlib import contextmanager
+from models.base_model import classes
+from models.engine import query
+from models.engine.stats import Stats
+
+
+class SQLiteStorage:
+    """SQLiteStorage: the same contract as FileStorage on top of sqlite3.
+
+    Each class gets a table holding the id, the timestamps, one indexed
+    column per attribute in its _indexed and the to_dict() JSON. Objects
+    are only loaded when asked for: __loaded maps keys to the live
+    instances (weakly, so memory does not grow with the database) and
+    __pending holds the objects changed since the last save, None
+    standing for a deletion. save() writes only __pending. count() adds
+    __delta, the objects a class gains or loses through __pending, to
+    the rows of its table; __stored tells whether a pending key has a
+    row, None until count() checks the keys in __unchecked. The table of
+    a class registered after reload() is created the first time it is
+    used; __tables lists the ones known to exist.
+
+    Statistics are enabled and read as with FileStorage.
+    """
+
+    def __init__(self, path=None):
+        """__init__.
+
+        :param path: the database file, $HBNB_SQLITE_PATH or file.db
+        """
+        self.__path = path or os.getenv("HBNB_SQLITE_PATH", "file.db")
+        self.__conn = None
+        self.__tables = set()
+        self.__loaded = weakref.WeakValueDictionary()
+        self.__pending = {}
+        self.__stored = {}
+        self.__delta = {}
+        self.__unchecked = {}
+        self.__batch = 0
+        self.__deferred = False
+        self.__stats = None
+        self.enable_stats(os.getenv("HBNB_STORAGE_STATS", "0") == "1")
+
+    def all(self, cls=None):
+        """all: returns a dictionary of every object, or only the
+        objects of the class cls.
+
+        :param cls: a class or class name, None for every object
+        """
+        if self.__stats is not None:
+            self.__stats.count("calls.all")
+        if cls is None:
+            names = classes.keys()
+        else:
+            names = [cls if isinstance(cls, str) else cls.__name__]
+        objs = {}
+        for name in names:
+            if name not in classes:
+                continue
+            self.__table(name)
+            rows = self.__conn.execute(f'SELECT id, data FROM "{name}"')
+            for row in rows:
+                key = f"{name}.{row[0]}"
+                if self.__pending.get(key, True) is not None:
+                    objs[key] = self.__load(key, row[1])
+            for key, obj in self.__pending.items():
+                if obj is not None and key.split(".", 1)[0] == name:
+                    objs[key] = obj
+        return objs
+
+    def count(self, cls=None):
+        """count: returns the number of objects, or of objects of the
+        class cls, counted by the database and corrected by __pending.
+
+        :param cls: a class or class name, None for every object
+        """
+        if self.__stats is not None:
+            self.__stats.count("calls.count")
+        if cls is None:
+            return sum(self.count(name) for name in classes)
+        name = cls if isinstance(cls, str) else cls.__name__
+        if name not in classes:
+            return 0
+        self.__table(name)
+        keys = list(self.__unchecked.pop(name, ()))
+        for i in range(0, len(keys), 500):
+            ids = [key.split(".", 1)[1] for key in keys[i:i + 500]]
+            stored = {row[0] for row in self.__conn.execute(
+                f'SELECT id FROM "{name}" WHERE id IN'
+                f' ({", ".join("?" * len(ids))})', ids)}
+            for key, id in zip(keys[i:i + 500], ids):
+                self.__stored[key] = id in stored
+                self.__delta[name] = (self.__delta.get(name, 0) +
+                                      (self.__pending[key] is not None) -
+                                      (id in stored))
+        count = self.__conn.execute(
+            f'SELECT COUNT(*) FROM "{name}"').fetchone()[0]
+        return count + self.__delta.get(name, 0)
+
+    def get(self, cls, id):
+        """get: returns the object of the class cls with this id, or None.
+
+        :param cls: a class or class name
+        :param id: the object id
+        """
+        if self.__stats is not None:
+            self.__stats.count("calls.get")
+        if not isinstance(cls, str):
+            cls = cls.__name__
+        key = f"{cls}.{id}"
+        if key in self.__pending:
+            return self.__pending[key]
+        obj = self.__loaded.get(key)
+        if obj is not None or cls not in classes:
+            return obj
+        self.__table(cls)
+        row = self.__conn.execute(f'SELECT data FROM "{cls}" WHERE id = ?',
+                                  (id,)).fetchone()
+        return None if row is None else self.__load(key, row[0])
+
+    def find(self, cls, **attrs):
+        """find: returns the dictionary of the objects of the class cls
+        whose attributes equal attrs, e.g. find(Review, place_id=id).
+
+        :param cls: a class or class name
+        """
+        conditions = [(attr, "=", value) for attr, value in attrs.items()]
+        return {f"{obj.__class__.__name__}.{obj.id}": obj
+                for obj in self.where(cls, *conditions)}
+
+    def where(self, cls, *conditions):
+        """where: yields the objects of the class cls that meet every
+        condition; see models.engine.query.
+
+        Equalities on indexed attributes are matched in SQL, and the
+        rows are read and checked one at a time.
+
+        :param cls: a class or class name
+        """
+        if self.__stats is not None:
+            self.__stats.count("calls.where")
+        if isinstance(cls, str):
+            cls = classes.get(cls)
+        if cls is None:
+            return
+        conditions = query.check(conditions)
+        name = cls.__name__
+        self.__table(name)
+        where = [(attr, value) for attr, value in query.equalities(conditions)
+                 if attr in cls._indexed]
+        sql = f'SELECT id, data FROM "{name}"'
+        if where:
+            sql += " WHERE " + " AND ".join(f"{a} = ?" for a, v in where)
+        pending = list(self.__pending.items())
+        for row in self.__conn.execute(sql, [value for attr, value in where]):
+            key = f"{name}.{row[0]}"
+            if key not in self.__pending:
+                obj = self.__load(key, row[1])
+                if query.matches(obj, conditions):
+                    yield obj
+        for key, obj in pending:
+            if (obj is not None and key.split(".", 1)[0] == name and
+                    query.matches(obj, conditions)):
+                yield obj
+
+    def new(self, obj):
+        """new: adds obj to the objects to insert on the next save.
+
+        :param obj: the object
+        """
+        if self.__stats is not None:
+            self.__stats.count("calls.new")
+        key = f"{obj.__class__.__name__}.{obj.id}"
+        self.__change(key, obj)
+        self.__loaded[key] = obj
+
+    def delete(self, obj=None):
+        """delete: removes obj from the database on the next save.
+
+        :param obj: the object
+        """
+        if self.__stats is not None:
+            self.__stats.count("calls.delete")
+        if obj is None:
+            return
+        key = f"{obj.__class__.__name__}.{obj.id}"
+        self.__change(key, None)
+        self.__loaded.pop(key, None)
+
+    def touch(self, obj, name=None):
+        """touch: flags obj as changed since the last save.
+
+        :param obj: the object
+        :param name: the attribute that changed, None if unknown
+        """
+        key = f"{obj.__class__.__name__}.{obj.id}"
+        if self.__loaded.get(key) is obj:
+            self.__change(key, obj)
+
+    @contextmanager
+    def batch(self):
+        """batch: defers the save() calls made inside the with block to a
+        single save when the outermost batch exits.
+
+        If the block raises, nothing is saved: the changes stay pending.
+        """
+        self.__batch += 1
+        try:
+            yield self
+        finally:
+            self.__batch -= 1
+        if not self.__batch and self.__deferred:
+            self.save()
+
+    def save(self):
+        """save: writes the objects changed since the last save in a
+        single transaction, or only records that it has to when a batch
+        is open."""
+        if self.__stats is not None:
+            self.__stats.count("calls.save")
+        self.__deferred = self.__batch > 0
+        if self.__deferred:
+            return
+        start = time.perf_counter()
+        for key in self.__pending:
+            self.__table(key.split(".", 1)[0])
+        with self.__conn:
+            for key, obj in self.__pending.items():
+                name, id = key.split(".", 1)
+                if obj is None:
+                    self.__conn.execute(f'DELETE FROM "{name}" WHERE id = ?',
+                                        (id,))
+                    continue
+                cls = classes[name]
+                columns = ("id", "created_at", "updated_at") + cls._indexed
+                data = obj.to_dict()
+                values = [id, data["created_at"], data["updated_at"]]
+                for attr in cls._indexed:
+                    value = getattr(obj, attr, None)
+                    if not isinstance(value, (str, int, float, type(None))):
+                        value = j.dumps(value)
+                    values.append(value)
+                self.__conn.execute(
+                    f'INSERT OR REPLACE INTO "{name}" ({", ".join(columns)},'
+                    f' data) VALUES ({", ".join("?" * len(columns))}, ?)',
+                    values + [j.dumps(data)])
+        if self.__stats is not None:
+            self.__stats.count("objects.serialized", sum(
+                obj is not None for obj in self.__pending.values()))
+            self.__stats.add_time("save", start)
+        self.__pending.clear()
+        self.__stored.clear()
+        self.__delta.clear()
+        self.__unchecked.clear()
+
+    def stats(self):
+        """stats: returns the counters and the timers, or None if they
+        are disabled."""
+        if self.__stats is None:
+            return None
+        return self.__stats.as_dict()
+
+    def enable_stats(self, enabled=True):
+        """enable_stats: starts collecting statistics from zero, or stops.
+
+        :param enabled: False to stop and forget them
+        """
+        self.__stats = Stats() if enabled else None
+
+    def flush(self):
+        """flush: nothing to do, save() writes before it returns."""
+        pass
+
+    def reload(self):
+        """reload: opens the database and creates the missing tables."""
+        if self.__conn is None:
+            self.__conn = sqlite3.connect(self.__path)
+            self.__conn.execute("PRAGMA journal_mode=WAL")
+            self.__conn.execute("PRAGMA synchronous=NORMAL")
+        with self.__conn:
+            for name in list(classes):
+                self.__table(name)
+
+    def close(self):
+        """close: closes the database connection."""
+        if self.__conn is not None:
+            self.__conn.close()
+            self.__conn = None
+
+    def __table(self, name):
+        """__table: creates the table of the class name and the indexes
+        of its _indexed attributes, unless they exist already."""
+        if name in self.__tables:
+            return
+        cls = classes[name]
+        columns = "".join(f", {attr} TEXT" for attr in cls._indexed)
+        self.__conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{name}" (id TEXT PRIMARY'
+            f' KEY, created_at TEXT, updated_at TEXT{columns},'
+            f' data TEXT NOT NULL)')
+        for attr in cls._indexed:
+            self.__conn.execute(
+                f'CREATE INDEX IF NOT EXISTS "{name}_{attr}"'
+                f' ON "{name}" ({attr})')
+        self.__tables.add(name)
+
+    def __change(self, key, obj):
+        """__change: makes obj, or None for a deletion, the pending
+        change of key and corrects __delta. A key loaded and not pending
+        has a row; any other is left to count() to check."""
+        name = key.split(".", 1)[0]
+        if key in self.__pending:
+            before = self.__pending[key] is not None
+            stored = self.__stored[key]
+        else:
+            stored = True if key in self.__loaded else None
+            before = stored
+            self.__stored[key] = stored
+            if stored is None:
+                self.__unchecked.setdefault(name, set()).add(key)
+        self.__pending[key] = obj
+        if stored is not None:
+            self.__delta[name] = (self.__delta.get(name, 0) +
+                                  (obj is not None) - before)
+
+    def __load(self, key, data):
+        """__load: returns the live object for key, building it from its
+        JSON data if it is not loaded yet."""
+        obj = self.__loaded.get(key)
+        if obj is None:
+            if self.__stats is not None:
+                self.__stats.count("objects.built")
+            obj = j.loads(data)
+            del obj["__class__"]
+            obj = classes[key.split(".", 1)[0]](**obj)
+            self.__loaded[key] = obj
+        return obj
@@ -0,0 +1,49 @@
+#!/usr/bin/python3
+"""counters and timers of the storage engines
+
+    An engine only holds a Stats while its statistics are enabled and
+    checks for None before counting, so disabled statistics cost one
+    attribute test per call.
+    """
+import time
+
+
+class Stats:
+    """Stats: named counters and named timers."""
+
+    def __init__(self):
+        """__init__: starts with every counter and timer at zero."""
+        self.counters = {}
+        self.timers = {}
+
+    def count(self, name, n=1):
+        """count: adds n to the counter name.
+
+        :param name: the counter
+        :param n: the amount to add
+        """
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_time(self, name, start):
+        """add_time: adds to the timer name the time elapsed since start,
+        a time.perf_counter() value, and returns the current one.
+
+        :param name: the timer
+        :param start: when the timed phase started
+        """
+        now = time.perf_counter()
+        timer = self.timers.get(name)
+        if timer is None:
+            self.timers[name] = [1, now - start]
+        else:
+            timer[0] += 1
+            timer[1] += now - start
+        return now
+
+    def as_dict(self):
+        """as_dict: returns a copy of the counters and timers, each timer
+        as {"calls": n, "seconds": total}."""
+        return {"counters": dict(sorted(self.counters.items())),
+                "timers": {name: {"calls": calls, "seconds": seconds}
+                           for name, (calls, seconds)
+                           in sorted(self.timers.items())}}
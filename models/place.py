@@ -6,6 +6,8 @@ from models.base_model import BaseModel
 class Place(BaseModel):
     """Represent a place."""
 
+    _indexed = ("city_id", "user_id")
+
     city_id = ""
     user_id = ""
     name = ""
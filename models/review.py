@@ -6,6 +6,8 @@ from models.base_model import BaseModel
 class Review(BaseModel):
     """Represent a review."""
 
+    _indexed = ("place_id", "user_id")
+
     place_id = ""
     user_id = ""
     text = ""
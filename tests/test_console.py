@@ -10,13 +10,21 @@ Unittest classes:
     TestHBNBCommand_all
     TestHBNBCommand_destroy
     TestHBNBCommand_update
+    TestHBNBCommand_batch
+    TestHBNBCommand_where
+    TestHBNBCommand_dot_call
+    TestHBNBCommand_stats
+    TestHBNBCommand_profile
 """
 import os
+import pstats
 import sys
+import tempfile
+import time
 import unittest
 from models import storage
 from models.engine.file_storage import FileStorage
-from console import HBNBCommand
+from console import CommandProfile, ErrorFilter, HBNBCommand
 from io import StringIO
 from unittest.mock import patch
 
@@ -43,5 +51,479 @@ class TestHBNBCommand_help(unittest.TestCase):
             self.assertEqual(h, output.getvalue().strip())
 
 
+@unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                 "models.storage is not a FileStorage")
+class TestHBNBCommand_all(unittest.TestCase):
+    """Unittests for testing all and count of the HBNB command interpreter."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def test_count(self):
+        with patch("sys.stdout", new=StringIO()):
+            HBNBCommand().onecmd("create User")
+            HBNBCommand().onecmd("create User")
+            HBNBCommand().onecmd("create Place")
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("User.count()"))
+            self.assertEqual("2", output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("Review.count()"))
+            self.assertEqual("0", output.getvalue().strip())
+
+    def test_count_invalid_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("MyModel.count()"))
+            self.assertEqual("** class doesn't exist **",
+                             output.getvalue().strip())
+
+    def test_all_with_class(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create User")
+            user_id = output.getvalue().strip()
+        with patch("sys.stdout", new=StringIO()):
+            HBNBCommand().onecmd("create Place")
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all User"))
+            self.assertIn(f"[User] ({user_id})", output.getvalue())
+            self.assertNotIn("[Place]", output.getvalue())
+
+    def create_users(self, count):
+        ids = []
+        for _ in range(count):
+            with patch("sys.stdout", new=StringIO()) as output:
+                HBNBCommand().onecmd("create User")
+                ids.append(output.getvalue().strip())
+        return ids
+
+    def test_all_output_format(self):
+        ids = self.create_users(2)
+        expected = str([str(storage.get("User", id)) for id in ids])
+        for line in ("all User", "User.all()", "all"):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(line))
+                self.assertEqual(expected, output.getvalue().strip())
+
+    def test_all_limit_offset(self):
+        ids = self.create_users(5)
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "User.all(limit=2, offset=1)"))
+            self.assertEqual(str([str(storage.get("User", id))
+                                  for id in ids[1:3]]),
+                             output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all limit=1"))
+            self.assertEqual(str([str(storage.get("User", ids[0]))]),
+                             output.getvalue().strip())
+
+    def test_all_after(self):
+        ids = self.create_users(4)
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                f'User.all(limit=2, after="{ids[0]}")'))
+            self.assertEqual(str([str(storage.get("User", id))
+                                  for id in ids[1:3]]),
+                             output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                f"all User after={ids[3]}"))
+            self.assertEqual("[]", output.getvalue().strip())
+
+    def test_all_reads_each_class(self):
+        ids = self.create_users(2)
+        with patch("sys.stdout", new=StringIO()):
+            HBNBCommand().onecmd("create Place")
+        with patch.object(type(storage), "all") as all_, \
+                patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("all"))
+        all_.assert_not_called()
+        self.assertIn(f"[User] ({ids[1]})", output.getvalue())
+        self.assertIn("[Place]", output.getvalue())
+
+    def test_all_invalid_paging(self):
+        for line in ("all User limit=-1", "all User size=3",
+                     "User.all(offset=x)", "all User limit<3"):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(line))
+                self.assertEqual("** invalid paging option **",
+                                 output.getvalue().strip())
+
+
+@unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                 "models.storage is not a FileStorage")
+class TestHBNBCommand_batch(unittest.TestCase):
+    """Unittests for testing the batch mode of the HBNB command interpreter."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def test_batch_saves_once(self):
+        lines = ["create User", "create Place", "create User"]
+        with patch.object(FileStorage, "compact", autospec=True) as compact:
+            with patch("sys.stdout", new=StringIO()) as output, \
+                    patch("sys.stderr", new=StringIO()):
+                self.assertEqual([], HBNBCommand().run_batch(lines))
+        self.assertEqual(1, compact.call_count)
+        self.assertEqual(3, len(output.getvalue().split()))
+
+    def test_batch_errors(self):
+        lines = ["# comment", "", "create MyModel", "User.count()",
+                 "show User"]
+        with patch("sys.stdout", new=StringIO()) as output, \
+                patch("sys.stderr", new=StringIO()) as error:
+            errors = HBNBCommand().run_batch(lines)
+        self.assertEqual([(3, "create MyModel", "** class doesn't exist **"),
+                          (5, "show User", "** instance id missing **")],
+                         errors)
+        self.assertEqual("0", output.getvalue().strip())
+        report = error.getvalue().splitlines()
+        self.assertTrue(report[0].startswith("3 commands in "))
+        self.assertTrue(report[0].endswith(", 2 errors"))
+        self.assertEqual("line 3: create MyModel: ** class doesn't exist **",
+                         report[1])
+
+    def test_error_filter(self):
+        out = StringIO()
+        output = ErrorFilter(out)
+        output.write("[User] (1)")
+        self.assertEqual("", out.getvalue())
+        output.write(" {}\n** no ")
+        self.assertEqual("[User] (1) {}\n", out.getvalue())
+        output.write("instance found **\n2")
+        output.end()
+        self.assertEqual("[User] (1) {}\n2\n", out.getvalue())
+        self.assertEqual(["** no instance found **"], output.errors)
+
+    def test_batch_stops_at_quit(self):
+        lines = ["create User", "quit", "create User"]
+        with patch("sys.stdout", new=StringIO()) as output, \
+                patch("sys.stderr", new=StringIO()):
+            HBNBCommand().run_batch(lines)
+        self.assertEqual(1, len(output.getvalue().split()))
+
+
+@unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                 "models.storage is not a FileStorage")
+class TestHBNBCommand_where(unittest.TestCase):
+    """Unittests for testing where queries of the HBNB command interpreter."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def create_place(self, city_id, price):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create Place")
+            place_id = output.getvalue().strip()
+        place = storage.get("Place", place_id)
+        place.city_id = city_id
+        place.price_by_night = price
+        return place
+
+    def test_where_dot_syntax(self):
+        cheap = self.create_place("c1", 50)
+        self.create_place("c1", 150)
+        self.create_place("c2", 50)
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                'Place.where(city_id="c1", price_by_night<100)'))
+            self.assertEqual(str([str(cheap)]), output.getvalue().strip())
+
+    def test_where_command(self):
+        self.create_place("c1", 50)
+        expensive = self.create_place("c1", 150)
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(
+                "where Place city_id='c1' price_by_night >= 100"))
+            self.assertEqual(str([str(expensive)]),
+                             output.getvalue().strip())
+
+    def test_where_after_update(self):
+        cheap = self.create_place("c1", 0)
+        expensive = self.create_place("c1", 0)
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd(f"update Place {cheap.id} price_by_night 50")
+            HBNBCommand().onecmd(f'Place.update("{expensive.id}",'
+                                 f' {{"price_by_night": "150"}})')
+            self.assertEqual(50, cheap.price_by_night)
+            self.assertEqual(150, expensive.price_by_night)
+            HBNBCommand().onecmd("Place.where(price_by_night<100)")
+            self.assertEqual(str([str(cheap)]), output.getvalue().strip())
+
+    def test_where_numeric_text(self):
+        place = self.create_place("123", 50)
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("Place.where(city_id=123)")
+            self.assertEqual(str([str(place)]), output.getvalue().strip())
+
+    def test_where_no_match(self):
+        self.create_place("c1", 50)
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("Place.where(city_id=c3)"))
+            self.assertEqual("[]", output.getvalue().strip())
+
+    def test_where_errors(self):
+        lines = {"where": "** class name missing **",
+                 "where MyModel": "** class doesn't exist **",
+                 "where Place price_by_night<": "** invalid condition **",
+                 "Place.where(name ~ 1)": "** invalid condition **"}
+        for line, error in lines.items():
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(line))
+                self.assertEqual(error, output.getvalue().strip())
+
+
+@unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                 "models.storage is not a FileStorage")
+class TestHBNBCommand_dot_call(unittest.TestCase):
+    """Unittests for testing the <Class>.<method>() calls of the HBNB
+    command interpreter."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+
+    def test_parse_arguments(self):
+        parse = HBNBCommand.parseArguments
+        self.assertEqual([], parse(""))
+        self.assertEqual(["a", "b c", "12"], parse('"a", \'b c\', 12'))
+        self.assertEqual(["x", "{'k': 1, 'j': [1, 2]}"],
+                         parse("x, {'k': 1, 'j': [1, 2]}"))
+
+    def test_unknown_method(self):
+        for line in ("User.foo()", "garbage", "User.show"):
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(line))
+                self.assertEqual(f"*** Unknown syntax: {line}",
+                                 output.getvalue().strip())
+
+    def test_show_and_destroy(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("User.create()")
+            user_id = output.getvalue().strip()
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(f'User.show("{user_id}")'))
+            self.assertIn(f"[User] ({user_id})", output.getvalue())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd(f"User.destroy({user_id})"))
+            self.assertEqual("", output.getvalue())
+        self.assertIsNone(storage.get("User", user_id))
+
+    def test_update(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create Place")
+            place_id = output.getvalue().strip()
+        HBNBCommand().onecmd(
+            f'Place.update("{place_id}", "name", "Big house")')
+        HBNBCommand().onecmd(
+            f"Place.update(\"{place_id}\", {{'max_guest': 4, \"a\": [1]}})")
+        HBNBCommand().onecmd(f"update Place {place_id} {{'number_rooms': 2}}")
+        place = storage.get("Place", place_id)
+        self.assertEqual("Big house", place.name)
+        self.assertEqual(4, place.max_guest)
+        self.assertEqual([1], place.a)
+        self.assertEqual(2, place.number_rooms)
+
+    def test_update_errors(self):
+        lines = {"User.update()": "** instance id missing **",
+                 "User.update(1, {'a': 1})": "** no instance found **",
+                 "MyModel.update(1, 'a', 1)": "** class doesn't exist **"}
+        for line, error in lines.items():
+            with patch("sys.stdout", new=StringIO()) as output:
+                self.assertFalse(HBNBCommand().onecmd(line))
+                self.assertEqual(error, output.getvalue().strip())
+
+
+class TestHBNBCommand_stats(unittest.TestCase):
+    """Unittests for testing the stats command of the HBNB command
+    interpreter."""
+
+    def tearDown(self):
+        storage.enable_stats(False)
+
+    def test_stats(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("stats off"))
+            self.assertFalse(HBNBCommand().onecmd("stats"))
+            self.assertEqual("** stats are off **", output.getvalue().strip())
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("stats on"))
+            self.assertFalse(HBNBCommand().onecmd("User.count()"))
+            self.assertFalse(HBNBCommand().onecmd("stats"))
+            self.assertIn("calls.count: 1", output.getvalue())
+
+    def test_stats_invalid_option(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("stats maybe"))
+            self.assertEqual("** invalid option **", output.getvalue().strip())
+
+
+class TestHBNBCommand_profile(unittest.TestCase):
+    """Unittests for testing the profile command of the HBNB command
+    interpreter."""
+
+    @classmethod
+    def setUp(self):
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    @classmethod
+    def tearDown(self):
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        HBNBCommand().onecmd("profile off")
+
+    def test_profile_dump(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("profile on"))
+            HBNBCommand().onecmd("User.count()")
+            HBNBCommand().onecmd("count User")
+            HBNBCommand().onecmd("show User 1")
+            HBNBCommand().onecmd("profile dump")
+        lines = output.getvalue().splitlines()
+        header = [i for i, line in enumerate(lines)
+                  if line.startswith("command ")]
+        self.assertEqual(1, len(header))
+        self.assertEqual(["command", "calls", "p50", "p99", "parse",
+                          "lookup", "mutation", "save", "print", "other"],
+                         lines[header[0]].split()[:10])
+        rows = lines[header[0] + 1:]
+        self.assertEqual([["count", "2"], ["show", "1"]],
+                         [row.split()[:2] for row in rows])
+
+    def test_profile_off(self):
+        HBNBCommand().onecmd("profile on")
+        HBNBCommand().onecmd("profile off")
+        self.assertNotIn("count", storage.__dict__)
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("profile dump"))
+            self.assertEqual("** profile is off **", output.getvalue().strip())
+
+    def test_profile_phases(self):
+        HBNBCommand().onecmd("profile on")
+        with patch("sys.stdout", new=StringIO()):
+            HBNBCommand().onecmd("create User")
+            HBNBCommand().onecmd("User.count()")
+        samples = HBNBCommand.profile.samples
+        for phase in ("parse", "mutation", "save", "print"):
+            self.assertGreater(samples["create"][phase][0], 0)
+        self.assertEqual(0, samples["create"]["lookup"][0])
+        for phase in ("parse", "lookup", "print"):
+            self.assertGreater(samples["count"][phase][0], 0)
+        self.assertEqual(0, samples["count"]["save"][0])
+        self.assertAlmostEqual(
+            samples["count"]["total"][0],
+            sum(samples["count"][phase][0]
+                for phase in CommandProfile.names))
+
+    def test_profile_where_iteration(self):
+        def where(self, cls, *conditions):
+            for _ in range(2):
+                time.sleep(0.01)
+                yield place
+        with patch("sys.stdout", new=StringIO()) as output:
+            HBNBCommand().onecmd("create Place")
+        place = storage.get("Place", output.getvalue().strip())
+        with patch.object(type(storage), "where", where):
+            HBNBCommand().onecmd("profile on")
+            with patch("sys.stdout", new=StringIO()) as output:
+                HBNBCommand().onecmd('Place.where(name="x")')
+            samples = HBNBCommand.profile.samples["where"]
+            HBNBCommand().onecmd("profile off")
+        self.assertEqual(2, output.getvalue().count("[Place]"))
+        self.assertGreaterEqual(samples["lookup"][0], 0.02)
+        self.assertLess(samples["other"][0], 0.01)
+
+    def test_profile_cprofile(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "profile.out")
+            with patch("sys.stdout", new=StringIO()) as output:
+                HBNBCommand().onecmd("profile on cprofile")
+                for _ in range(8):
+                    HBNBCommand().onecmd("User.count()")
+                HBNBCommand().onecmd(f"profile dump {path}")
+            self.assertEqual(5, output.getvalue().count("slow: "))
+            self.assertTrue(pstats.Stats(path).total_calls > 0)
+
+    def test_profile_invalid_option(self):
+        with patch("sys.stdout", new=StringIO()) as output:
+            self.assertFalse(HBNBCommand().onecmd("profile maybe"))
+            self.assertEqual("** invalid option **", output.getvalue().strip())
+
+
 if __name__ == "__main__":
     unittest.main()
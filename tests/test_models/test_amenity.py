@@ -127,6 +127,8 @@ class TestAmenity_save(unittest.TestCase):
         with self.assertRaises(TypeError):
             am.save(None)
 
+    @unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                     "file.json is not used")
     def test_save_updates_file(self):
         am = Amenity()
         am.save()
@@ -4,12 +4,18 @@ the classes of Unittest:
     TestBaseModel_instantiation
     TestBaseModel_save
     TestBaseModel_to_dict
+    TestBaseModel_compact
+    TestBaseModel_registry
 """
 import os
+import subprocess
+import sys
+import tempfile
 import models
 import unittest
 from datetime import datetime
 from time import sleep
+from unittest.mock import patch
 from models.base_model import BaseModel
 
 
@@ -97,6 +103,34 @@ class TestBaseModel_instantiation(unittest.TestCase):
         self.assertEqual(bm.created_at, dt)
         self.assertEqual(bm.updated_at, dt)
 
+    def test_instantiation_with_whole_second_kwargs(self):
+        """test_instantiation_with_whole_second_kwargs."""
+        dt = datetime(2017, 9, 28, 21, 3, 54)
+        bm = BaseModel(id="345", created_at=dt.isoformat(),
+                       updated_at=dt.isoformat())
+        self.assertEqual(bm.created_at, dt)
+        self.assertEqual(bm.updated_at, dt)
+
+    def test_instantiation_with_partial_kwargs(self):
+        """test_instantiation_with_partial_kwargs."""
+        bm = BaseModel(name="Holberton")
+        self.assertEqual(str, type(bm.id))
+        self.assertEqual(datetime, type(bm.created_at))
+        self.assertEqual(["id", "created_at", "updated_at", "name"],
+                         list(bm.__dict__))
+
+    def test_parse_datetime_fallback(self):
+        """test_parse_datetime_fallback."""
+        from models.base_model import parse_datetime
+        dt = datetime(2017, 9, 28, 21, 3, 54, 52298)
+        self.assertEqual(dt, parse_datetime(dt.isoformat()))
+        with patch("models.base_model.datetime") as mock:
+            mock.fromisoformat.side_effect = ValueError
+            mock.strptime.return_value = dt
+            self.assertEqual(dt, parse_datetime(dt.isoformat()))
+            mock.strptime.assert_called_once_with(
+                dt.isoformat(), '%Y-%m-%dT%H:%M:%S.%f')
+
 
 class TestBaseModel_to_dict(unittest.TestCase):
     """a class for dictionary test"""
@@ -204,6 +238,8 @@ class TestBaseModel_save(unittest.TestCase):
         bm.save()
         self.assertLess(first_updated_at, bm.updated_at)
 
+    @unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                     "file.json is not used")
     def test_save_updates_file(self):
         """test_save_updates_file."""
         bm = BaseModel()
@@ -213,5 +249,65 @@ class TestBaseModel_save(unittest.TestCase):
             self.assertIn(bmid, f.read())
 
 
+class TestBaseModel_compact(unittest.TestCase):
+    """a class for compact (HBNB_COMPACT_MODELS=1) model testing"""
+
+    def run_compact(self, code):
+        """run_compact: runs code in a child process with compact models
+        and returns its output."""
+        env = dict(os.environ, HBNB_COMPACT_MODELS="1",
+                   PYTHONPATH=os.path.abspath(os.curdir))
+        with tempfile.TemporaryDirectory() as cwd:
+            return subprocess.run([sys.executable, "-c", code], env=env,
+                                  cwd=cwd, check=True, capture_output=True,
+                                  text=True).stdout.split()
+
+    def test_fields_are_slots(self):
+        """test_fields_are_slots."""
+        out = self.run_compact(
+            "from models.place import Place\n"
+            "p = Place()\n"
+            "print(hasattr(p, '__weakref__'), 'city_id' in Place.__slots__,"
+            " repr(Place.city_id), repr(p.city_id), p.__dict__ == {"
+            "'id': p.id, 'created_at': p.created_at,"
+            " 'updated_at': p.updated_at})\n")
+        self.assertEqual(["True", "True", "''", "''", "True"], out)
+
+    def test_overflow_and_to_dict(self):
+        """test_overflow_and_to_dict."""
+        out = self.run_compact(
+            "from models.user import User\n"
+            "u = User(id='1', created_at='2017-09-28T21:03:54.052298',"
+            " updated_at='2017-09-28T21:03:54.052302', first_name='Bob')\n"
+            "u.nickname = 'B'\n"
+            "d = u.to_dict()\n"
+            "print(d['first_name'], d['nickname'], d['__class__'],"
+            " u.nickname, User(**d).nickname,"
+            " str(u).startswith('[User] (1)'))\n"
+            "del u.nickname\n"
+            "print(hasattr(u, 'nickname'))\n")
+        self.assertEqual(["Bob", "B", "User", "B", "B", "True", "False"], out)
+
+
+class TestBaseModel_registry(unittest.TestCase):
+    """a class for model registry testing"""
+
+    def test_models_are_registered(self):
+        """test_models_are_registered."""
+        from models.user import User
+        self.assertIs(BaseModel, models.classes["BaseModel"])
+        self.assertIs(User, models.classes["User"])
+        self.assertEqual({"BaseModel", "User", "State", "City", "Amenity",
+                          "Place", "Review"}, set(models.classes))
+
+    def test_subclass_is_registered(self):
+        """test_subclass_is_registered."""
+        class MyModel(BaseModel):
+            """a model defined by the test."""
+
+        self.addCleanup(models.classes.pop, "MyModel")
+        self.assertIs(MyModel, models.classes["MyModel"])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -133,6 +133,8 @@ class TestCity_save(unittest.TestCase):
         with self.assertRaises(TypeError):
             cy.save(None)
 
+    @unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                     "file.json is not used")
     def test_save_updates_file(self):
         cy = City()
         cy.save()
@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+"""file for the tests for models/engine/binary_snapshot.py
+
+Unittest classes:
+    TestBinarySnapshot
+"""
+import os
+import tempfile
+import unittest
+from models.engine import binary_snapshot
+
+
+class TestBinarySnapshot(unittest.TestCase):
+    """a class for binary snapshot testing"""
+
+    def setUp(self):
+        """setUp."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "file.bin")
+
+    def tearDown(self):
+        """tearDown."""
+        self.tmp.cleanup()
+
+    def snapshot(self, records):
+        """snapshot: writes records and maps them back."""
+        with open(self.path, "wb") as f:
+            binary_snapshot.write(f, records)
+        snapshot = binary_snapshot.Snapshot(self.path)
+        self.addCleanup(snapshot.close)
+        return snapshot
+
+    def test_get(self):
+        """test_get."""
+        records = [(f"User.{i}", '{"id": "%d"}' % i) for i in range(500)]
+        snapshot = self.snapshot(records)
+        self.assertEqual(500, snapshot.count)
+        for key, text in records:
+            self.assertEqual(text, snapshot.get(key))
+        self.assertIsNone(snapshot.get("User.500"))
+        self.assertIsNone(snapshot.get("Place.1"))
+
+    def test_iter(self):
+        """test_iter."""
+        records = [("City.é", '{"name": "Montréal"}'), ("State.1", "{}")]
+        self.assertEqual(records, list(self.snapshot(records)))
+
+    def test_empty(self):
+        """test_empty."""
+        snapshot = self.snapshot([])
+        self.assertEqual([], list(snapshot))
+        self.assertIsNone(snapshot.get("User.1"))
+
+    def test_not_a_snapshot(self):
+        """test_not_a_snapshot."""
+        with open(self.path, "wb") as f:
+            f.write(b"{}" * 32)
+        with self.assertRaises(ValueError):
+            binary_snapshot.Snapshot(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
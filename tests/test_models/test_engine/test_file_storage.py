@@ -4,13 +4,26 @@
 Unittest classes:
     TestFileStorage_instantiation
     TestFileStorage_methods
+    TestFileStorage_journal
+    TestFileStorage_dirty
+    TestFileStorage_find
+    TestFileStorage_binary
+    TestFileStorage_batch
 """
 import os
+import sys
+import glob
 import json
+import time
+import threading
+import subprocess
 import models
 import unittest
 from datetime import datetime
+from io import StringIO
+from unittest.mock import patch
 from models.base_model import BaseModel
+from models.engine import file_storage
 from models.engine.file_storage import FileStorage
 from models.user import User
 from models.state import State
@@ -40,11 +53,15 @@ class TestFileStorage_instantiation(unittest.TestCase):
         with self.assertRaises(TypeError):
             FileStorage(None)
 
+    @unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                     "models.storage is not a FileStorage")
     def test_storage_initializes(self):
         """test_storage_initializes."""
         self.assertEqual(type(models.storage), FileStorage)
 
 
+@unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                 "models.storage is not a FileStorage")
 class TestFileStorage_methods(unittest.TestCase):
     """a class for method testing"""
 
@@ -141,10 +158,54 @@ class TestFileStorage_methods(unittest.TestCase):
         self.assertIn("Amenity." + am.id, objs)
         self.assertIn("Review." + rv.id, objs)
 
-    def test_all_with_arg(self):
-        """test_all_with_arg."""
+    def test_all_with_none(self):
+        """test_all_with_none."""
+        thread_safe = models.storage.thread_safe
+        self.addCleanup(setattr, models.storage, "thread_safe", thread_safe)
+        models.storage.thread_safe = False
+        self.assertIs(models.storage.all(), models.storage.all(None))
+
+    def test_all_with_cls(self):
+        """test_all_with_cls."""
+        bm = BaseModel()
+        us = User()
+        self.assertEqual({"User." + us.id: us}, models.storage.all(User))
+        self.assertEqual({"User." + us.id: us}, models.storage.all("User"))
+        self.assertIn("BaseModel." + bm.id, models.storage.all(BaseModel))
+        self.assertEqual({}, models.storage.all(Review))
+
+    def test_all_with_cls_after_delete(self):
+        """test_all_with_cls_after_delete."""
+        us = User()
+        models.storage.delete(us)
+        self.assertNotIn("User." + us.id, models.storage.all(User))
+        self.assertNotIn("User." + us.id, models.storage.all())
+
+    def test_all_with_cls_after_reload(self):
+        """test_all_with_cls_after_reload."""
+        us = User()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.assertEqual({}, models.storage.all(User))
+        models.storage.reload()
+        self.assertIn("User." + us.id, models.storage.all(User))
+
+    def test_reload_registered_subclass(self):
+        """test_reload_registered_subclass."""
+        class MyModel(BaseModel):
+            """a model unknown to file_storage.py."""
+
+        self.addCleanup(models.classes.pop, "MyModel")
+        my = MyModel()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertIs(MyModel, type(models.storage.get(MyModel, my.id)))
+
+    def test_all_with_args(self):
+        """test_all_with_args."""
         with self.assertRaises(TypeError):
-            models.storage.all(None)
+            models.storage.all(User, None)
 
     def test_save(self):
         """test_save."""
@@ -179,6 +240,1287 @@ class TestFileStorage_methods(unittest.TestCase):
         with self.assertRaises(TypeError):
             models.storage.reload(None)
 
+    def test_reload_in_small_chunks(self):
+        """test_reload_in_small_chunks."""
+        bm = BaseModel()
+        bm.name = "Holberton"
+        us = User()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        fs = FileStorage()
+        fs.chunk_size = 5
+        fs.reload()
+        objs = FileStorage._FileStorage__objects
+        self.assertEqual("Holberton", objs["BaseModel." + bm.id].name)
+        self.assertEqual(us.created_at, objs["User." + us.id].created_at)
+
+
+@unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                 "models.storage is not a FileStorage")
+class TestFileStorage_journal(unittest.TestCase):
+    """a class for journal mode testing"""
+
+    def setUp(self):
+        """setUp."""
+        for name in ("file.json", "file.json.log"):
+            try:
+                os.rename(name, name + ".backup")
+            except IOError:
+                pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__changes = {}
+        self.storage = FileStorage()
+        self.storage.journal = True
+
+    def tearDown(self):
+        """tearDown."""
+        for name in ("file.json", "file.json.log"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+            try:
+                os.rename(name + ".backup", name)
+            except IOError:
+                pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_compact_after_save(self):
+        """test_compact_after_save."""
+        us = User(first_name="Old")
+        self.storage.new(us)
+        self.storage.compact()
+        us.first_name = "New"
+        self.storage.save()
+        self.storage.compact()
+        self.assertFalse(os.path.exists("file.json.log"))
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual("New", self.storage.get(User, us.id).first_name)
+
+    def test_save_appends_only_changes(self):
+        """test_save_appends_only_changes."""
+        bm = BaseModel()
+        self.storage.compact()
+        us = User()
+        self.storage.save()
+        with open("file.json", "r") as f:
+            snapshot = f.read()
+        with open("file.json.log", "r") as f:
+            lines = f.readlines()
+        self.assertIn("BaseModel." + bm.id, snapshot)
+        self.assertNotIn("User." + us.id, snapshot)
+        self.assertEqual(1, len(lines))
+        self.assertIn("User." + us.id, lines[0])
+
+    def test_reload_replays_log(self):
+        """test_reload_replays_log."""
+        bm = BaseModel()
+        self.storage.compact()
+        bm.name = "Holberton"
+        bm.save()
+        us = User()
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        objs = self.storage.all()
+        self.assertEqual("Holberton", objs["BaseModel." + bm.id].name)
+        self.assertIn("User." + us.id, objs)
+
+    def test_delete_writes_tombstone(self):
+        """test_delete_writes_tombstone."""
+        bm = BaseModel()
+        self.storage.save()
+        self.storage.delete(bm)
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertNotIn("BaseModel." + bm.id, self.storage.all())
+
+    def test_reload_drops_torn_record(self):
+        """test_reload_drops_torn_record."""
+        bm = BaseModel()
+        self.storage.save()
+        with open("file.json.log", "a") as f:
+            f.write('["User.1", {"id": ')
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertIn("BaseModel." + bm.id, self.storage.all())
+        self.assertNotIn("User.1", self.storage.all())
+        us = User()
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertIn("User." + us.id, self.storage.all())
+
+    def test_reload_drops_torn_batch(self):
+        """test_reload_drops_torn_batch."""
+        bm = BaseModel()
+        self.storage.save()
+        with self.storage.batch():
+            User().save()
+            User().save()
+            self.storage.delete(bm)
+        with open("file.json.log", "r") as f:
+            lines = f.readlines()
+        self.assertEqual(["[null, 3]\n"], lines[1:2])
+        with open("file.json.log", "w") as f:
+            f.writelines(lines[:-1])
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(["BaseModel." + bm.id], list(self.storage.all()))
+        with open("file.json.log", "r") as f:
+            self.assertEqual(lines[:1], f.readlines())
+
+    def test_compact_drops_log(self):
+        """test_compact_drops_log."""
+        bm = BaseModel()
+        self.storage.save()
+        self.storage.compact()
+        self.assertFalse(os.path.exists("file.json.log"))
+        with open("file.json", "r") as f:
+            self.assertIn("BaseModel." + bm.id, f.read())
+
+
+@unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                 "models.storage is not a FileStorage")
+class TestFileStorage_dirty(unittest.TestCase):
+    """a class for dirty-object tracking testing"""
+
+    def setUp(self):
+        """setUp."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        """tearDown."""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_clean_objects_are_not_encoded(self):
+        """test_clean_objects_are_not_encoded."""
+        bm = BaseModel()
+        us = User()
+        models.storage.save()
+        bm.name = "Holberton"
+        with patch.object(User, "to_dict", side_effect=AssertionError):
+            models.storage.save()
+        with open("file.json", "r") as f:
+            saved = json.load(f)
+        self.assertEqual("Holberton", saved["BaseModel." + bm.id]["name"])
+        self.assertIn("User." + us.id, saved)
+
+    def test_assignment_marks_dirty(self):
+        """test_assignment_marks_dirty."""
+        us = User()
+        models.storage.save()
+        us.first_name = "Bob"
+        models.storage.save()
+        with open("file.json", "r") as f:
+            saved = json.load(f)
+        self.assertEqual("Bob", saved["User." + us.id]["first_name"])
+
+    def test_touch_marks_in_place_change(self):
+        """test_touch_marks_in_place_change."""
+        pl = Place()
+        pl.amenity_ids = []
+        models.storage.save()
+        pl.amenity_ids.append("123")
+        models.storage.touch(pl)
+        models.storage.save()
+        with open("file.json", "r") as f:
+            saved = json.load(f)
+        self.assertEqual(["123"], saved["Place." + pl.id]["amenity_ids"])
+
+    def test_reload_reuses_file_text(self):
+        """test_reload_reuses_file_text."""
+        bm = BaseModel()
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        with patch.object(BaseModel, "to_dict", side_effect=AssertionError):
+            models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertIn("BaseModel." + bm.id, json.load(f))
+
+    def test_delete_drops_object(self):
+        """test_delete_drops_object."""
+        bm = BaseModel()
+        models.storage.save()
+        models.storage.delete(bm)
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertNotIn("BaseModel." + bm.id, json.load(f))
+
+
+@unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                 "models.storage is not a FileStorage")
+class TestFileStorage_find(unittest.TestCase):
+    """a class for attribute index testing"""
+
+    def setUp(self):
+        """setUp."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        """tearDown."""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_find_indexed(self):
+        """test_find_indexed."""
+        rv1 = Review()
+        rv1.place_id = "p1"
+        rv2 = Review()
+        rv2.place_id = "p2"
+        found = models.storage.find(Review, place_id="p1")
+        self.assertEqual({"Review." + rv1.id: rv1}, found)
+        self.assertEqual({}, models.storage.find("Review", place_id="p3"))
+
+    def test_find_follows_updates(self):
+        """test_find_follows_updates."""
+        cy = City()
+        cy.state_id = "s1"
+        cy.state_id = "s2"
+        self.assertEqual({}, models.storage.find(City, state_id="s1"))
+        self.assertIn("City." + cy.id,
+                      models.storage.find(City, state_id="s2"))
+        models.storage.delete(cy)
+        self.assertEqual({}, models.storage.find(City, state_id="s2"))
+
+    def test_find_several_attributes(self):
+        """test_find_several_attributes."""
+        pl1 = Place()
+        pl1.city_id = "c1"
+        pl1.user_id = "u1"
+        pl2 = Place()
+        pl2.city_id = "c1"
+        pl2.name = "Home"
+        found = models.storage.find(Place, city_id="c1", name="Home")
+        self.assertEqual({"Place." + pl2.id: pl2}, found)
+        found = models.storage.find(Place, city_id="c1", user_id="u1")
+        self.assertEqual({"Place." + pl1.id: pl1}, found)
+
+    def test_find_not_indexed(self):
+        """test_find_not_indexed."""
+        us = User()
+        us.email = "a@b.c"
+        User()
+        found = models.storage.find(User, email="a@b.c")
+        self.assertEqual({"User." + us.id: us}, found)
+
+    def test_find_after_reload(self):
+        """test_find_after_reload."""
+        rv = Review()
+        rv.user_id = "u1"
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        found = models.storage.find(Review, user_id="u1")
+        self.assertEqual(["Review." + rv.id], list(found))
+
+    def test_count(self):
+        """test_count."""
+        self.assertEqual(0, models.storage.count())
+        us = User()
+        User()
+        Place()
+        self.assertEqual(3, models.storage.count())
+        self.assertEqual(2, models.storage.count(User))
+        self.assertEqual(1, models.storage.count("Place"))
+        self.assertEqual(0, models.storage.count("MyModel"))
+        models.storage.delete(us)
+        self.assertEqual(1, models.storage.count(User))
+        models.storage.save()
+        FileStorage._FileStorage__objects = {}
+        models.storage.reload()
+        self.assertEqual(1, models.storage.count(User))
+        self.assertEqual(2, models.storage.count())
+
+    def test_where(self):
+        """test_where."""
+        pl1 = Place()
+        pl1.city_id = "c1"
+        pl1.price_by_night = 50
+        pl2 = Place()
+        pl2.city_id = "c1"
+        pl2.price_by_night = 150
+        pl3 = Place()
+        pl3.price_by_night = 10
+        found = models.storage.where(Place, ("city_id", "=", "c1"),
+                                     ("price_by_night", "<", 100))
+        self.assertEqual([pl1], list(found))
+        found = models.storage.where("Place", ("price_by_night", ">=", 50))
+        self.assertEqual({pl1, pl2}, set(found))
+        self.assertEqual([], list(models.storage.where("MyModel")))
+
+    def test_where_uses_index(self):
+        """test_where_uses_index."""
+        rv1 = Review()
+        rv1.place_id = "p1"
+        rv2 = Review()
+        rv2.place_id = "p2"
+        with patch("models.engine.query.matches",
+                   return_value=True) as matches:
+            found = list(models.storage.where(Review,
+                                              ("place_id", "==", "p1")))
+        self.assertEqual([rv1], found)
+        self.assertEqual(1, matches.call_count)
+
+    def test_where_unorderable(self):
+        """test_where_unorderable."""
+        pl = Place()
+        pl.price_by_night = "cheap"
+        self.assertEqual([], list(models.storage.where(
+            Place, ("price_by_night", "<", 100))))
+        self.assertEqual([pl], list(models.storage.where(
+            Place, ("price_by_night", "!=", 100))))
+
+    def test_where_unknown_operator(self):
+        """test_where_unknown_operator."""
+        with self.assertRaises(ValueError):
+            list(models.storage.where(Place, ("price_by_night", "~", 1)))
+
+
+@unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                 "models.storage is not a FileStorage")
+class TestFileStorage_binary(unittest.TestCase):
+    """a class for binary snapshot format testing"""
+
+    def setUp(self):
+        """setUp."""
+        for name in ("file.json", "file.json.log", "file.bin"):
+            try:
+                os.rename(name, name + ".backup")
+            except IOError:
+                pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__changes = {}
+        self.storage = FileStorage()
+        self.storage.format = "binary"
+
+    def tearDown(self):
+        """tearDown."""
+        FileStorage._FileStorage__objects = {}
+        self.storage.all()
+        for name in ("file.json", "file.json.log", "file.bin"):
+            try:
+                os.remove(name)
+            except IOError:
+                pass
+            try:
+                os.rename(name + ".backup", name)
+            except IOError:
+                pass
+
+    def cold_start(self):
+        """cold_start: forgets every object and reloads the store."""
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        return FileStorage._FileStorage__objects
+
+    def test_save_writes_binary_only(self):
+        """test_save_writes_binary_only."""
+        BaseModel()
+        self.storage.save()
+        self.assertTrue(os.path.exists("file.bin"))
+        self.assertFalse(os.path.exists("file.json"))
+
+    def test_save_writes_both(self):
+        """test_save_writes_both."""
+        bm = BaseModel()
+        self.storage.format = "both"
+        self.storage.save()
+        with open("file.json", "r") as f:
+            self.assertIn("BaseModel." + bm.id, json.load(f))
+        self.assertTrue(os.path.exists("file.bin"))
+
+    def test_get_builds_one_object(self):
+        """test_get_builds_one_object."""
+        us = User()
+        us.first_name = "Bob"
+        bm = BaseModel()
+        self.storage.save()
+        objs = self.cold_start()
+        self.assertEqual({}, objs)
+        loaded = self.storage.get(User, us.id)
+        self.assertEqual("Bob", loaded.first_name)
+        self.assertEqual(["User." + us.id], list(objs))
+        self.assertIs(loaded, self.storage.get("User", us.id))
+        self.assertIsNone(self.storage.get(User, bm.id))
+        self.assertIn("BaseModel." + bm.id, self.storage.all())
+
+    def test_all_loads_everything(self):
+        """test_all_loads_everything."""
+        us = User()
+        pl = Place()
+        pl.city_id = "c1"
+        self.storage.save()
+        self.cold_start()
+        self.assertIn("Place." + pl.id,
+                      self.storage.find(Place, city_id="c1"))
+        self.assertIn("User." + us.id, self.storage.all(User))
+
+    def test_compact_keeps_unloaded_records(self):
+        """test_compact_keeps_unloaded_records."""
+        us = User()
+        bm = BaseModel()
+        self.storage.save()
+        self.cold_start()
+        self.storage.get(User, us.id).first_name = "Bob"
+        self.storage.save()
+        self.assertEqual(["User." + us.id],
+                         list(FileStorage._FileStorage__objects))
+        self.cold_start()
+        self.assertEqual("Bob", self.storage.get(User, us.id).first_name)
+        self.assertIsNotNone(self.storage.get(BaseModel, bm.id))
+
+    def test_delete_hides_mapped_record(self):
+        """test_delete_hides_mapped_record."""
+        us = User()
+        bm = BaseModel()
+        self.storage.save()
+        self.cold_start()
+        self.storage.delete(self.storage.get(User, us.id))
+        self.assertIsNone(self.storage.get(User, us.id))
+        self.assertNotIn("User." + us.id, self.storage.all())
+        self.assertIn("BaseModel." + bm.id, self.storage.all())
+
+    def test_journal_on_binary(self):
+        """test_journal_on_binary."""
+        us = User()
+        bm = BaseModel()
+        self.storage.save()
+        self.storage.journal = True
+        self.cold_start()
+        self.storage.delete(self.storage.get(User, us.id))
+        self.storage.save()
+        self.cold_start()
+        self.assertIsNone(self.storage.get(User, us.id))
+        self.assertIsNotNone(self.storage.get(BaseModel, bm.id))
+
+
+@unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                 "models.storage is not a FileStorage")
+class TestFileStorage_batch(unittest.TestCase):
+    """a class for batch testing"""
+
+    def setUp(self):
+        """setUp."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def tearDown(self):
+        """tearDown."""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_batch_saves_once_on_exit(self):
+        """test_batch_saves_once_on_exit."""
+        with patch.object(FileStorage, "compact",
+                          autospec=True) as compact:
+            with models.storage.batch():
+                for _ in range(3):
+                    BaseModel().save()
+                models.storage.save()
+                self.assertEqual(0, compact.call_count)
+            self.assertEqual(1, compact.call_count)
+
+    def test_batch_writes_on_exit(self):
+        """test_batch_writes_on_exit."""
+        with models.storage.batch():
+            us = User()
+            us.save()
+            self.assertFalse(os.path.exists("file.json"))
+        with open("file.json", "r") as f:
+            self.assertIn("User." + us.id, json.load(f))
+
+    def test_nested_batch(self):
+        """test_nested_batch."""
+        with models.storage.batch():
+            with models.storage.batch():
+                BaseModel().save()
+            self.assertFalse(os.path.exists("file.json"))
+        self.assertTrue(os.path.exists("file.json"))
+
+    def test_batch_without_save(self):
+        """test_batch_without_save."""
+        with models.storage.batch():
+            BaseModel()
+        self.assertFalse(os.path.exists("file.json"))
+
+    def test_failed_batch_writes_nothing(self):
+        """test_failed_batch_writes_nothing."""
+        with self.assertRaises(KeyError):
+            with models.storage.batch():
+                us = User()
+                us.save()
+                raise KeyError
+        self.assertFalse(os.path.exists("file.json"))
+        models.storage.save()
+        with open("file.json", "r") as f:
+            self.assertIn("User." + us.id, json.load(f))
+
+
+@unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                 "models.storage is not a FileStorage")
+class TestFileStorage_write_behind(unittest.TestCase):
+    """a class for write-behind testing"""
+
+    def setUp(self):
+        """setUp."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        FileStorage._FileStorage__changes = {}
+        self.storage = FileStorage()
+        self.storage.write_behind = True
+        self.storage.flush_interval = 60
+
+    def tearDown(self):
+        """tearDown."""
+        self.storage.close()
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def wait_for_file(self):
+        """wait_for_file: waits up to 5 seconds for file.json."""
+        for _ in range(500):
+            if os.path.exists("file.json"):
+                return True
+            time.sleep(0.01)
+        return False
+
+    def test_save_returns_before_writing(self):
+        """test_save_returns_before_writing."""
+        us = User()
+        self.storage.save()
+        self.assertFalse(os.path.exists("file.json"))
+        self.storage.flush()
+        with open("file.json", "r") as f:
+            self.assertIn("User." + us.id, json.load(f))
+
+    def test_flush_without_save(self):
+        """test_flush_without_save."""
+        BaseModel()
+        self.storage.flush()
+        self.assertFalse(os.path.exists("file.json"))
+
+    def test_flush_after_changes(self):
+        """test_flush_after_changes."""
+        self.storage.flush_changes = 2
+        BaseModel()
+        self.storage.save()
+        time.sleep(0.05)
+        self.assertFalse(os.path.exists("file.json"))
+        BaseModel()
+        self.storage.save()
+        self.assertTrue(self.wait_for_file())
+
+    def test_flush_on_interval(self):
+        """test_flush_on_interval."""
+        self.storage.flush_interval = 0.01
+        BaseModel()
+        self.storage.save()
+        self.assertTrue(self.wait_for_file())
+
+    def test_close(self):
+        """test_close."""
+        us = User()
+        self.storage.save()
+        self.storage.close()
+        with open("file.json", "r") as f:
+            self.assertIn("User." + us.id, json.load(f))
+        bm = BaseModel()
+        self.storage.save()
+        self.storage.close()
+        with open("file.json", "r") as f:
+            self.assertIn("BaseModel." + bm.id, json.load(f))
+
+    def test_failed_flush_keeps_changes(self):
+        """test_failed_flush_keeps_changes."""
+        us = User()
+        self.storage.save()
+        with patch("models.engine.file_storage.os.replace",
+                   side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.storage.flush()
+        self.storage.flush()
+        with open("file.json", "r") as f:
+            self.assertIn("User." + us.id, json.load(f))
+
+    def test_flush_waits_for_background_write(self):
+        """test_flush_waits_for_background_write."""
+        replace = os.replace
+        writing = threading.Event()
+
+        def slow_replace(*args):
+            writing.set()
+            time.sleep(0.3)
+            replace(*args)
+        us = User()
+        with patch("os.replace", side_effect=slow_replace):
+            self.storage.flush_interval = 0.01
+            self.storage.save()
+            self.assertTrue(writing.wait(5))
+            self.storage.flush()
+            with open("file.json", "r") as f:
+                self.assertIn("User." + us.id, json.load(f))
+            self.storage.flush_interval = 60
+
+    def test_failed_background_flush(self):
+        """test_failed_background_flush."""
+        replace = os.replace
+        failures = []
+
+        def fail_once(*args):
+            if not failures:
+                failures.append(args)
+                raise OSError("disk full")
+            replace(*args)
+        us = User()
+        with patch("os.replace", side_effect=fail_once), \
+                patch("sys.stderr", new_callable=StringIO) as stderr:
+            self.storage.flush_interval = 0.01
+            self.storage.save()
+            for _ in range(500):
+                if failures:
+                    break
+                time.sleep(0.01)
+            self.storage.flush_interval = 60
+            self.storage.close()
+        self.assertIn("disk full", stderr.getvalue())
+        with open("file.json", "r") as f:
+            self.assertIn("User." + us.id, json.load(f))
+
+
+@unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                 "models.storage is not a FileStorage")
+class TestFileStorage_durability(unittest.TestCase):
+    """a class for atomic save and durability testing"""
+
+    def setUp(self):
+        """setUp."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage()
+
+    def tearDown(self):
+        """tearDown."""
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_save_leaves_no_temp_file(self):
+        """test_save_leaves_no_temp_file."""
+        BaseModel()
+        self.storage.save()
+        self.assertTrue(os.path.exists("file.json"))
+        self.assertEqual([], glob.glob("file.json.*"))
+
+    def test_concurrent_processes(self):
+        """test_concurrent_processes."""
+        script = ("from models.user import User\n"
+                  "for i in range(20):\n"
+                  "    User().save()\n")
+        env = dict(os.environ, PYTHONPATH=os.getcwd())
+        env.pop("HBNB_TYPE_STORAGE", None)
+        env.pop("HBNB_FILE_LOCKING", None)
+        processes = [subprocess.Popen([sys.executable, "-c", script],
+                                      env=env) for _ in range(4)]
+        for process in processes:
+            self.assertEqual(0, process.wait())
+        self.storage.reload()
+        self.assertGreater(self.storage.count(User), 0)
+        self.assertEqual([], glob.glob("file.json.*"))
+
+    def test_failed_save_keeps_old_file(self):
+        """test_failed_save_keeps_old_file."""
+        us = User()
+        self.storage.save()
+        with open("file.json", "r") as f:
+            before = f.read()
+        bm = BaseModel()
+        with patch("models.engine.file_storage.os.replace",
+                   side_effect=OSError):
+            with self.assertRaises(OSError):
+                self.storage.save()
+        with open("file.json", "r") as f:
+            self.assertEqual(before, f.read())
+        self.assertEqual([], glob.glob("file.json.*"))
+        self.storage.save()
+        with open("file.json", "r") as f:
+            saved = json.load(f)
+        self.assertIn("User." + us.id, saved)
+        self.assertIn("BaseModel." + bm.id, saved)
+
+    def sync_calls(self, durability):
+        """sync_calls: returns the fsync and fdatasync calls of a save."""
+        self.storage.durability = durability
+        BaseModel()
+        with patch("models.engine.file_storage.os.fsync") as fsync, \
+                patch("models.engine.file_storage.os.fdatasync",
+                      create=True) as fdatasync:
+            self.storage.save()
+        return fsync.call_count, fdatasync.call_count
+
+    def test_durability_none(self):
+        """test_durability_none."""
+        self.assertEqual((0, 0), self.sync_calls("none"))
+
+    def test_durability_flush(self):
+        """test_durability_flush."""
+        self.assertEqual((0, 1), self.sync_calls("flush"))
+
+    @unittest.skipIf(not hasattr(os, "O_DIRECTORY"), "no directory fsync")
+    def test_durability_fsync(self):
+        """test_durability_fsync."""
+        self.assertEqual((1, 1), self.sync_calls("fsync"))
+
+
+@unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                 "models.storage is not a FileStorage")
+class TestFileStorage_shards(unittest.TestCase):
+    """a class for sharded storage testing"""
+
+    def setUp(self):
+        """setUp."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage()
+        self.storage.shards = "class"
+
+    def tearDown(self):
+        """tearDown."""
+        for path in glob.glob("file.*.json"):
+            os.remove(path)
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def load(self, path):
+        """load: returns the JSON content of path."""
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def test_save_one_file_per_class(self):
+        """test_save_one_file_per_class."""
+        us = User()
+        pl = Place()
+        self.storage.save()
+        self.assertFalse(os.path.exists("file.json"))
+        self.assertEqual(["User." + us.id], list(self.load("file.User.json")))
+        self.assertEqual(["Place." + pl.id],
+                         list(self.load("file.Place.json")))
+
+    def test_save_rewrites_dirty_shards_only(self):
+        """test_save_rewrites_dirty_shards_only."""
+        us = User()
+        Place()
+        self.storage.save()
+        os.remove("file.Place.json")
+        us.first_name = "Betty"
+        self.storage.save()
+        self.assertFalse(os.path.exists("file.Place.json"))
+        self.assertEqual("Betty",
+                         self.load("file.User.json")["User." + us.id]
+                         ["first_name"])
+
+    def test_reload_loads_shards_on_demand(self):
+        """test_reload_loads_shards_on_demand."""
+        us = User()
+        pl = Place()
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        objs = FileStorage._FileStorage__objects
+        self.assertEqual({}, objs)
+        self.assertEqual(us.id, self.storage.get(User, us.id).id)
+        self.assertEqual(["User." + us.id], list(objs))
+        self.assertIn("Place." + pl.id, self.storage.all(Place))
+        self.assertEqual(2, len(self.storage.all()))
+
+    def test_new_in_unloaded_shard(self):
+        """test_new_in_unloaded_shard."""
+        us = User()
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        us2 = User()
+        self.storage.save()
+        self.assertEqual({"User." + us.id, "User." + us2.id},
+                         set(self.load("file.User.json")))
+
+    def test_delete_last_object_of_shard(self):
+        """test_delete_last_object_of_shard."""
+        us = User()
+        self.storage.save()
+        self.storage.delete(us)
+        self.storage.save()
+        self.assertFalse(os.path.exists("file.User.json"))
+
+    def test_hash_buckets(self):
+        """test_hash_buckets."""
+        self.storage.shards = "4"
+        keys = {f"User.{User().id}" for _ in range(20)}
+        self.storage.save()
+        paths = glob.glob("file.*.json")
+        self.assertTrue(all(path[5:-5] in "0123" for path in paths))
+        self.assertEqual(keys, {key for path in paths
+                                for key in self.load(path)})
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(keys, set(self.storage.all(User)))
+
+    def test_compact_rewrites_every_shard(self):
+        """test_compact_rewrites_every_shard."""
+        us = User()
+        self.storage.save()
+        os.remove("file.User.json")
+        self.storage.compact()
+        self.assertIn("User." + us.id, self.load("file.User.json"))
+
+
+@unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                 "models.storage is not a FileStorage")
+class TestFileStorage_compression(unittest.TestCase):
+    """a class for compressed storage testing"""
+
+    def setUp(self):
+        """setUp."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage()
+
+    def tearDown(self):
+        """tearDown."""
+        for path in glob.glob("file.*"):
+            os.remove(path)
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def round_trip(self, path, magic):
+        """round_trip: saves, checks the file at path starts with magic
+        and reloads it."""
+        us = User()
+        us.first_name = "Betty"
+        self.storage.save()
+        self.assertFalse(os.path.exists("file.json"))
+        with open(path, "rb") as f:
+            self.assertEqual(magic, f.read(len(magic)))
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual("Betty", self.storage.get(User, us.id).first_name)
+
+    def test_gzip(self):
+        """test_gzip."""
+        self.storage.compression = "gzip"
+        self.round_trip("file.json.gz", b"\x1f\x8b")
+
+    def test_bz2(self):
+        """test_bz2."""
+        self.storage.compression = "bz2"
+        self.round_trip("file.json.bz2", b"BZh")
+
+    def test_lzma(self):
+        """test_lzma."""
+        self.storage.compression = "lzma"
+        self.round_trip("file.json.xz", b"\xfd7zXZ")
+
+    def test_extension(self):
+        """test_extension."""
+        with patch.object(FileStorage, "_FileStorage__file_path",
+                          "file.json.gz"):
+            self.round_trip("file.json.gz", b"\x1f\x8b")
+
+    def test_compressed_shards(self):
+        """test_compressed_shards."""
+        self.storage.compression = "gzip"
+        self.storage.shards = "class"
+        self.round_trip("file.User.json.gz", b"\x1f\x8b")
+        self.assertEqual(["file.User.json.gz"], glob.glob("file.*"))
+
+
+@unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                 "models.storage is not a FileStorage")
+class TestFileStorage_stats(unittest.TestCase):
+    """a class for statistics testing"""
+
+    def setUp(self):
+        """setUp."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage()
+        self.storage.enable_stats()
+
+    def tearDown(self):
+        """tearDown."""
+        for path in ("file.json", "file.json.log"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_disabled(self):
+        """test_disabled."""
+        self.storage.enable_stats(False)
+        BaseModel()
+        self.storage.save()
+        self.assertIsNone(self.storage.stats())
+
+    def test_save(self):
+        """test_save."""
+        us = User()
+        self.storage.new(us)
+        self.storage.save()
+        stats = self.storage.stats()
+        self.assertEqual(1, stats["counters"]["calls.new"])
+        self.assertEqual(1, stats["counters"]["calls.save"])
+        self.assertEqual(1, stats["counters"]["objects.serialized"])
+        self.assertEqual(os.path.getsize("file.json"),
+                         stats["counters"]["bytes.written"])
+        for timer in ("save", "save.encode", "save.write"):
+            self.assertEqual(1, stats["timers"][timer]["calls"])
+            self.assertGreaterEqual(stats["timers"][timer]["seconds"], 0)
+        self.storage.save()
+        stats = self.storage.stats()
+        self.assertEqual(1, stats["counters"]["objects.serialized"])
+        self.assertEqual(2, stats["timers"]["save"]["calls"])
+
+    def test_reload(self):
+        """test_reload."""
+        User()
+        Place()
+        self.storage.save()
+        self.storage.enable_stats()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        stats = self.storage.stats()
+        self.assertEqual(1, stats["counters"]["calls.reload"])
+        self.assertEqual(2, stats["counters"]["objects.built"])
+        self.assertEqual(os.path.getsize("file.json"),
+                         stats["counters"]["bytes.read"])
+        self.assertEqual(2, stats["timers"]["reload.parse"]["calls"])
+        self.assertEqual(2, stats["timers"]["reload.build"]["calls"])
+        self.assertEqual(1, stats["timers"]["reload"]["calls"])
+
+    def test_journal(self):
+        """test_journal."""
+        self.storage.journal = True
+        BaseModel()
+        self.storage.save()
+        stats = self.storage.stats()
+        self.assertEqual(os.path.getsize("file.json.log"),
+                         stats["counters"]["bytes.written"])
+        self.assertEqual(1, stats["counters"]["objects.serialized"])
+
+
+@unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                 "models.storage is not a FileStorage")
+@unittest.skipIf(file_storage.fcntl is None, "no fcntl")
+class TestFileStorage_locking(unittest.TestCase):
+    """a class for multi-process storage testing"""
+
+    def setUp(self):
+        """setUp."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage()
+        self.storage.locking = True
+
+    def tearDown(self):
+        """tearDown."""
+        for path in ("file.json", "file.json.lock", "file.json.log"):
+            try:
+                os.remove(path)
+            except IOError:
+                pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def other_process(self, change):
+        """other_process: rewrites file.json as another process would,
+        calling change on its content."""
+        with open("file.json", encoding="utf-8") as f:
+            content = json.load(f)
+        change(content)
+        with open("file.json.tmp", "w", encoding="utf-8") as f:
+            json.dump(content, f)
+        os.replace("file.json.tmp", "file.json")
+
+    def test_merge(self):
+        """test_merge."""
+        kept = User()
+        changed = User()
+        gone = User()
+        self.storage.save()
+        added = User(first_name="Holberton")
+
+        def change(content):
+            content[f"User.{changed.id}"]["first_name"] = "Betty"
+            del content[f"User.{gone.id}"]
+            content[f"User.{added.id}"] = added.to_dict()
+        self.other_process(change)
+        ours = Place()
+        self.storage.save()
+        with open("file.json", encoding="utf-8") as f:
+            content = json.load(f)
+        self.assertEqual({f"User.{kept.id}", f"User.{changed.id}",
+                          f"User.{added.id}", f"Place.{ours.id}"},
+                         set(content))
+        self.assertEqual("Betty",
+                         content[f"User.{changed.id}"]["first_name"])
+        self.assertIs(kept, self.storage.get(User, kept.id))
+        self.assertEqual("Betty",
+                         self.storage.get(User, changed.id).first_name)
+        self.assertEqual("Holberton",
+                         self.storage.get(User, added.id).first_name)
+        self.assertIsNone(self.storage.get(User, gone.id))
+        self.assertEqual(4, self.storage.count())
+
+    def test_ours_win(self):
+        """test_ours_win."""
+        us = User()
+        deleted = User()
+        self.storage.save()
+
+        def change(content):
+            content[f"User.{us.id}"]["first_name"] = "Theirs"
+            content[f"User.{deleted.id}"]["first_name"] = "Theirs"
+        self.other_process(change)
+        us.first_name = "Ours"
+        self.storage.delete(deleted)
+        self.storage.save()
+        with open("file.json", encoding="utf-8") as f:
+            content = json.load(f)
+        self.assertEqual("Ours", content[f"User.{us.id}"]["first_name"])
+        self.assertNotIn(f"User.{deleted.id}", content)
+
+    def test_reload(self):
+        """test_reload."""
+        us = User()
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.other_process(lambda content: content.clear())
+        self.storage.save()
+        self.assertIsNone(self.storage.get(User, us.id))
+
+    def test_unchanged(self):
+        """test_unchanged."""
+        us = User()
+        self.storage.save()
+        with patch.object(FileStorage, "_FileStorage__build") as build:
+            self.storage.save()
+            self.other_process(lambda content: None)
+            self.storage.save()
+        build.assert_not_called()
+        self.assertIs(us, self.storage.get(User, us.id))
+
+    def test_lock(self):
+        """test_lock."""
+        BaseModel()
+        with patch.object(file_storage.fcntl, "flock") as flock:
+            self.storage.save()
+        self.assertEqual([file_storage.fcntl.LOCK_EX,
+                          file_storage.fcntl.LOCK_UN],
+                         [call.args[1] for call in flock.call_args_list])
+        self.assertTrue(os.path.exists("file.json.lock"))
+
+    def test_journal(self):
+        """test_journal."""
+        self.storage.journal = True
+        BaseModel()
+        self.storage.save()
+        self.assertTrue(os.path.exists("file.json"))
+        self.assertFalse(os.path.exists("file.json.log"))
+
+    def test_processes(self):
+        """test_processes."""
+        script = ("from models import storage\n"
+                  "from models.user import User\n"
+                  "for i in range(10):\n"
+                  "    User().save()\n")
+        env = dict(os.environ, HBNB_FILE_LOCKING="1",
+                   PYTHONPATH=os.getcwd())
+        env.pop("HBNB_TYPE_STORAGE", None)
+        processes = [subprocess.Popen([sys.executable, "-c", script],
+                                      env=env) for _ in range(4)]
+        for process in processes:
+            self.assertEqual(0, process.wait())
+        self.storage.reload()
+        self.assertEqual(40, self.storage.count(User))
+
+
+@unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                 "models.storage is not a FileStorage")
+class TestFileStorage_threads(unittest.TestCase):
+    """a class for thread-safe storage testing"""
+
+    def setUp(self):
+        """setUp."""
+        try:
+            os.rename("file.json", "tmp")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+        self.storage = FileStorage()
+        self.thread_safe = self.storage.thread_safe
+        self.storage.thread_safe = True
+
+    def tearDown(self):
+        """tearDown."""
+        self.storage.thread_safe = self.thread_safe
+        try:
+            os.remove("file.json")
+        except IOError:
+            pass
+        try:
+            os.rename("tmp", "file.json")
+        except IOError:
+            pass
+        FileStorage._FileStorage__objects = {}
+
+    def test_copies(self):
+        """test_copies."""
+        us = User()
+        objs = self.storage.all()
+        users = self.storage.all(User)
+        matching = self.storage.where(User, ("id", "=", us.id))
+        self.assertIs(us, next(matching))
+        Place()
+        self.storage.delete(us)
+        self.assertEqual([f"User.{us.id}"], list(objs))
+        self.assertEqual([f"User.{us.id}"], list(users))
+        self.assertEqual([], list(matching))
+        self.assertEqual(1, self.storage.count())
+
+    def test_stress(self):
+        """test_stress."""
+        errors = []
+        running = threading.Event()
+        running.set()
+
+        def guarded(target):
+            def run():
+                try:
+                    target()
+                except Exception as e:
+                    errors.append(e)
+                    running.clear()
+            return threading.Thread(target=run)
+
+        def write():
+            for i in range(100):
+                user = User()
+                user.first_name = f"user {i % 10}"
+                if i % 4 == 0:
+                    self.storage.delete(user)
+                if i % 25 == 24:
+                    self.storage.save()
+
+        def read():
+            while running.is_set():
+                for obj in self.storage.all().values():
+                    obj.id
+                for user in self.storage.all(User).values():
+                    self.storage.get(User, user.id)
+                self.storage.count(User)
+                self.storage.find(User, first_name="user 1")
+                list(self.storage.where(User, ("first_name", "<", "user 5")))
+
+        writers = [guarded(write) for _ in range(4)]
+        readers = [guarded(read) for _ in range(4)]
+        for thread in writers + readers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        running.clear()
+        for thread in readers:
+            thread.join()
+        self.assertEqual([], errors)
+        self.assertEqual(300, self.storage.count(User))
+        self.assertEqual(40, len(self.storage.find(User,
+                                                   first_name="user 1")))
+        self.storage.save()
+        FileStorage._FileStorage__objects = {}
+        self.storage.reload()
+        self.assertEqual(300, self.storage.count(User))
+
 
 if __name__ == "__main__":
     unittest.main()
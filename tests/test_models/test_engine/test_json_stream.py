@@ -0,0 +1,61 @@
+#!/usr/bin/python3
+"""file for the tests for models/engine/json_stream.py
+
+Unittest classes:
+    TestJsonStream_iter_members
+"""
+import json
+import unittest
+from io import StringIO
+from models.engine.json_stream import iter_members
+
+
+class TestJsonStream_iter_members(unittest.TestCase):
+    """a class for iter_members testing"""
+
+    def setUp(self):
+        """setUp."""
+        self.data = {
+            "User.1": {"id": "1", "first_name": 'B"ob {x}'},
+            "Place.2": {"id": "2", "amenity_ids": ["a", "b"],
+                        "latitude": 1.5, "nested": {"k": [1, {}]}},
+            "State.3": {"id": "3"}
+        }
+
+    def test_members_match_json_load(self):
+        """test_members_match_json_load."""
+        text = json.dumps(self.data)
+        for chunk_size in (1, 2, 7, 64, 1 << 16):
+            members = list(iter_members(StringIO(text), chunk_size))
+            self.assertEqual(self.data, {k: v for k, v, _ in members})
+
+    def test_value_text_is_source(self):
+        """test_value_text_is_source."""
+        text = json.dumps(self.data, indent=4)
+        for key, value, source in iter_members(StringIO(text), 3):
+            self.assertEqual(value, json.loads(source))
+            self.assertEqual(("{", "}"), (source[0], source[-1]))
+
+    def test_empty_object(self):
+        """test_empty_object."""
+        self.assertEqual([], list(iter_members(StringIO(" { } "), 1)))
+
+    def test_empty_file(self):
+        """test_empty_file."""
+        with self.assertRaises(ValueError):
+            list(iter_members(StringIO(""), 4))
+
+    def test_truncated_file(self):
+        """test_truncated_file."""
+        text = json.dumps(self.data)[:-5]
+        with self.assertRaises(ValueError):
+            list(iter_members(StringIO(text), 4))
+
+    def test_missing_comma(self):
+        """test_missing_comma."""
+        with self.assertRaises(ValueError):
+            list(iter_members(StringIO('{"a": {} "b": {}}'), 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
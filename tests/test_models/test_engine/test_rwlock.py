@@ -0,0 +1,117 @@
+#!/usr/bin/python3
+"""file for the tests for models/engine/rwlock.py
+
+Unittest classes:
+    TestRWLock
+"""
+import threading
+import time
+import unittest
+from models.engine.rwlock import RWLock
+
+
+class TestRWLock(unittest.TestCase):
+    """a class for RWLock testing"""
+
+    def setUp(self):
+        """setUp."""
+        self.lock = RWLock()
+
+    def start(self, target):
+        """start: runs target in a daemon thread, returning the thread."""
+        thread = threading.Thread(target=target, daemon=True)
+        thread.start()
+        return thread
+
+    def test_shared_reads(self):
+        """test_shared_reads."""
+        barrier = threading.Barrier(3, timeout=5)
+
+        def read():
+            with self.lock.read():
+                barrier.wait()
+        threads = [self.start(read) for _ in range(2)]
+        with self.lock.read():
+            barrier.wait()
+        for thread in threads:
+            thread.join(5)
+            self.assertFalse(thread.is_alive())
+
+    def test_write_excludes_reads(self):
+        """test_write_excludes_reads."""
+        done = threading.Event()
+
+        def read():
+            with self.lock.read():
+                done.set()
+        with self.lock:
+            thread = self.start(read)
+            self.assertFalse(done.wait(0.1))
+        self.assertTrue(done.wait(5))
+        thread.join(5)
+
+    def test_read_excludes_writes(self):
+        """test_read_excludes_writes."""
+        done = threading.Event()
+
+        def write():
+            with self.lock:
+                done.set()
+        with self.lock.read():
+            thread = self.start(write)
+            self.assertFalse(done.wait(0.1))
+        self.assertTrue(done.wait(5))
+        thread.join(5)
+
+    def test_waiting_writer_first(self):
+        """test_waiting_writer_first."""
+        order = []
+        reading = threading.Event()
+        release = threading.Event()
+
+        def first_reader():
+            with self.lock.read():
+                reading.set()
+                release.wait(5)
+
+        def write():
+            with self.lock:
+                order.append("write")
+
+        def read():
+            with self.lock.read():
+                order.append("read")
+        threads = [self.start(first_reader)]
+        reading.wait(5)
+        threads.append(self.start(write))
+        while not self.lock._RWLock__waiting:
+            time.sleep(0.01)
+        threads.append(self.start(read))
+        time.sleep(0.1)
+        self.assertEqual([], order)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(["write", "read"], order)
+
+    def test_reentrant(self):
+        """test_reentrant."""
+        with self.lock:
+            with self.lock:
+                with self.lock.read():
+                    with self.lock.read():
+                        pass
+        with self.lock.read():
+            with self.lock.read():
+                pass
+        done = threading.Event()
+
+        def write():
+            with self.lock:
+                done.set()
+        self.start(write)
+        self.assertTrue(done.wait(5))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,218 @@
+#!/usr/bin/python3
+"""file for the tests for models/engine/sqlite_storage.py
+
+Unittest classes:
+    TestSQLiteStorage_methods
+"""
+import os
+import sqlite3
+import tempfile
+import unittest
+import models
+from unittest.mock import patch
+from models.base_model import BaseModel
+from models.engine.sqlite_storage import SQLiteStorage
+from models.user import User
+from models.place import Place
+from models.review import Review
+
+
+class TestSQLiteStorage_methods(unittest.TestCase):
+    """a class for method testing"""
+
+    def setUp(self):
+        """setUp."""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "file.db")
+        self.storage = SQLiteStorage(self.path)
+        self.storage.enable_stats(False)
+        self.storage.reload()
+        self.patch = patch("models.storage", self.storage)
+        self.patch.start()
+
+    def tearDown(self):
+        """tearDown."""
+        self.patch.stop()
+        self.storage.close()
+        self.tmp.cleanup()
+
+    def reopen(self):
+        """reopen: returns a fresh storage on the same database."""
+        self.storage.close()
+        self.storage = SQLiteStorage(self.path)
+        self.storage.reload()
+        return self.storage
+
+    def test_new_is_visible_before_save(self):
+        """test_new_is_visible_before_save."""
+        us = User()
+        self.assertIs(us, self.storage.all()["User." + us.id])
+        self.assertIs(us, self.storage.get(User, us.id))
+
+    def test_save_and_reload(self):
+        """test_save_and_reload."""
+        us = User()
+        us.first_name = "Bob"
+        self.storage.save()
+        storage = self.reopen()
+        loaded = storage.get("User", us.id)
+        self.assertEqual("Bob", loaded.first_name)
+        self.assertEqual(us.created_at, loaded.created_at)
+        self.assertEqual(["User." + us.id], list(storage.all(User)))
+        self.assertEqual({}, storage.all(Place))
+
+    def test_update_is_saved(self):
+        """test_update_is_saved."""
+        us = User()
+        self.storage.save()
+        storage = self.reopen()
+        with patch("models.storage", storage):
+            storage.get(User, us.id).last_name = "Betty"
+            storage.save()
+        self.assertEqual("Betty", self.reopen().get(User, us.id).last_name)
+
+    def test_delete(self):
+        """test_delete."""
+        us = User()
+        self.storage.save()
+        self.storage.delete(us)
+        self.assertIsNone(self.storage.get(User, us.id))
+        self.assertNotIn("User." + us.id, self.storage.all())
+        self.storage.save()
+        self.assertIsNone(self.reopen().get(User, us.id))
+
+    def test_find(self):
+        """test_find."""
+        rv1 = Review()
+        rv1.place_id = "p1"
+        rv1.text = "nice"
+        rv2 = Review()
+        rv2.place_id = "p2"
+        self.storage.save()
+        storage = self.reopen()
+        found = storage.find(Review, place_id="p1")
+        self.assertEqual(["Review." + rv1.id], list(found))
+        found = storage.find("Review", place_id="p1", text="bad")
+        self.assertEqual({}, found)
+        self.assertEqual({}, storage.find("MyModel", place_id="p1"))
+
+    def test_find_sees_unsaved_changes(self):
+        """test_find_sees_unsaved_changes."""
+        rv = Review()
+        rv.place_id = "p1"
+        self.storage.save()
+        rv.place_id = "p2"
+        self.assertEqual({}, self.storage.find(Review, place_id="p1"))
+        self.assertIn("Review." + rv.id,
+                      self.storage.find(Review, place_id="p2"))
+
+    def test_count(self):
+        """test_count."""
+        us1 = User()
+        us2 = User()
+        Place()
+        self.assertEqual(2, self.storage.count(User))
+        self.storage.save()
+        self.storage.delete(us1)
+        us2.first_name = "Betty"
+        User()
+        self.assertEqual(2, self.storage.count("User"))
+        self.assertEqual(3, self.storage.count())
+        self.assertEqual(0, self.storage.count("MyModel"))
+        self.storage.save()
+        self.assertEqual(2, self.reopen().count(User))
+
+    def test_count_many_pending(self):
+        """test_count_many_pending."""
+        conn = self.storage._SQLiteStorage__conn
+        conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 500)
+        users = [User() for _ in range(1200)]
+        self.assertEqual(1200, self.storage.count(User))
+        self.storage.save()
+        for us in users[:700]:
+            self.storage.delete(us)
+        for us in users[700:]:
+            us.first_name = "Betty"
+        stray = User(id=users[0].id)
+        self.storage.new(stray)
+        User()
+        self.assertEqual(502, self.storage.count(User))
+        self.storage.delete(stray)
+        self.assertEqual(501, self.storage.count(User))
+        self.storage.save()
+        self.assertEqual(501, self.reopen().count(User))
+
+    def test_stats(self):
+        """test_stats."""
+        self.assertIsNone(self.storage.stats())
+        self.storage.enable_stats()
+        us = User()
+        self.storage.save()
+        self.reopen().enable_stats()
+        self.storage.get(User, us.id)
+        stats = self.storage.stats()
+        self.assertEqual(1, stats["counters"]["calls.get"])
+        self.assertEqual(1, stats["counters"]["objects.built"])
+
+    def test_where(self):
+        """test_where."""
+        pl1 = Place()
+        pl1.city_id = "c1"
+        pl1.price_by_night = 50
+        pl2 = Place()
+        pl2.city_id = "c1"
+        pl2.price_by_night = 150
+        Place().price_by_night = 10
+        self.storage.save()
+        pl2.price_by_night = 20
+        found = self.storage.where("Place", ("price_by_night", "<", 100))
+        self.assertEqual(3, len(list(found)))
+        storage = self.reopen()
+        found = storage.where(Place, ("city_id", "=", "c1"),
+                              ("price_by_night", "<", 100))
+        self.assertEqual([pl1.id], [obj.id for obj in found])
+
+    def test_batch(self):
+        """test_batch."""
+        other = SQLiteStorage(self.path)
+        other.reload()
+        self.addCleanup(other.close)
+        with self.storage.batch():
+            us = User()
+            us.save()
+            self.assertIsNone(other.get(User, us.id))
+        self.assertEqual(us.id, other.get(User, us.id).id)
+
+    def test_class_defined_late(self):
+        """test_class_defined_late."""
+        class Late(BaseModel):
+            """a model registered after reload()."""
+            _indexed = ("name",)
+
+        self.addCleanup(models.classes.pop, "Late")
+        self.assertEqual({}, self.storage.all(Late))
+        self.assertEqual(0, self.storage.count())
+        late = Late()
+        late.name = "x"
+        late.save()
+        storage = self.reopen()
+        self.assertEqual("x", storage.get(Late, late.id).name)
+        self.assertEqual([late.id],
+                         [obj.id for obj in storage.where(
+                             "Late", ("name", "=", "x"))])
+
+    def test_schema(self):
+        """test_schema."""
+        conn = sqlite3.connect(self.path)
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        indexes = [row[1] for row in conn.execute(
+            "SELECT * FROM sqlite_master WHERE type = 'index'")]
+        conn.close()
+        self.assertEqual("wal", mode)
+        self.assertIn("Place_city_id", indexes)
+        self.assertIn("Review_place_id", indexes)
+        self.assertIn("City_state_id", indexes)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -187,6 +187,8 @@ class TestPlace_save(unittest.TestCase):
         with self.assertRaises(TypeError):
             pl.save(None)
 
+    @unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                     "file.json is not used")
     def test_save_updates_file(self):
         pl = Place()
         pl.save()
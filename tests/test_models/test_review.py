@@ -139,6 +139,8 @@ class TestReview_save(unittest.TestCase):
         with self.assertRaises(TypeError):
             rv.save(None)
 
+    @unittest.skipIf(os.getenv("HBNB_TYPE_STORAGE") == "sqlite",
+                     "file.json is not used")
     def test_save_updates_file(self):
         rv = Review()
         rv.save()